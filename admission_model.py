@@ -0,0 +1,244 @@
+#!/usr/bin/env python3
+"""
+Admission Probability Model
+Career Guidance System
+
+Trains a scikit-learn classifier on data/jk_college_training_data.csv and
+serves it for batch inference: all candidate colleges for a student are
+scored in one vectorized call (predict_proba, or the equivalent folded
+weights for the default linear model). The artifact is reloaded when the
+file changes, so retraining swaps the model without a restart.
+
+    python admission_model.py --train
+"""
+
+import argparse
+import csv
+import hashlib
+import math
+import os
+import pickle
+import threading
+import time
+from datetime import datetime
+
+import numpy as np
+
+from catalog import calculate_admission_probability
+
+TRAINING_CSV = 'data/jk_college_training_data.csv'
+MODEL_PATH = os.environ.get('CAREER_ADMISSION_MODEL', 'models/admission_model.pkl')
+CHECK_INTERVAL = float(os.environ.get('CAREER_MODEL_CHECK_INTERVAL', '5.0'))
+
+# Student features first, then college features; rows are built in this order
+FEATURES = ('academic_percentage', 'admission_difficulty', 'log_fee', 'is_government')
+
+# Range of the academic_performance quiz question
+ACADEMIC_RANGE = (40.0, 100.0)
+
+# Keep model output away from certainty - the training set is small
+PROBABILITY_RANGE = (0.05, 0.95)
+
+
+def college_features(college):
+    return [
+        float(college.get('admission_difficulty') or 1),
+        math.log1p(float(college.get('avg_fee_annual') or 0)),
+        float(college.get('is_government') or 0)
+    ]
+
+
+def academic_percentage(responses):
+    try:
+        value = float((responses or {}).get('academic_performance'))
+    except (TypeError, ValueError):
+        return None
+    if math.isnan(value):
+        return None
+    return min(ACADEMIC_RANGE[1], max(ACADEMIC_RANGE[0], value))
+
+
+def linear_scorer(model):
+    # StandardScaler + LogisticRegression folded into one weight vector, so a
+    # request costs a dot product instead of sklearn's input validation.
+    # Other estimators are scored through predict_proba.
+    steps = [step for _, step in getattr(model, 'steps', [(None, model)])]
+    if len(steps) != 2 or type(steps[0]).__name__ != 'StandardScaler' \
+            or type(steps[1]).__name__ != 'LogisticRegression' or len(steps[1].classes_) != 2:
+        return None
+    scaler, classifier = steps
+    scale = np.where(scaler.scale_ == 0, 1.0, scaler.scale_)
+    weights = classifier.coef_[0] / scale
+    bias = classifier.intercept_[0] - float(np.dot(scaler.mean_, weights))
+    return weights, bias
+
+
+def read_training_data(csv_file=TRAINING_CSV):
+    features = []
+    labels = []
+    with open(csv_file, newline='', encoding='utf-8') as f:
+        for row in csv.DictReader(f):
+            college = {
+                'admission_difficulty': row['college_admission_difficulty'],
+                'avg_fee_annual': row['college_avg_fee'],
+                'is_government': row['college_is_government']
+            }
+            features.append([float(row['academic_percentage'])] + college_features(college))
+            labels.append(int(row['admitted']))
+    return np.array(features), np.array(labels)
+
+
+def train_model(csv_file=TRAINING_CSV, output=MODEL_PATH):
+    from sklearn.linear_model import LogisticRegression
+    from sklearn.pipeline import make_pipeline
+    from sklearn.preprocessing import StandardScaler
+    import sklearn
+
+    X, y = read_training_data(csv_file)
+    if len(set(y)) < 2:
+        raise ValueError("Training data needs both admitted and rejected examples")
+
+    model = make_pipeline(StandardScaler(), LogisticRegression(C=1.0, class_weight='balanced'))
+    model.fit(X, y)
+
+    with open(csv_file, 'rb') as f:
+        data_hash = hashlib.sha1(f.read()).hexdigest()[:12]
+
+    artifact = {
+        "model": model,
+        "features": FEATURES,
+        "version": f"{data_hash}-{datetime.now().strftime('%Y%m%d%H%M%S')}",
+        "trained_at": datetime.now().isoformat(),
+        "training_rows": len(y),
+        "sklearn_version": sklearn.__version__,
+        "training_accuracy": round(float(model.score(X, y)), 4)
+    }
+
+    # Write next to the target and rename, so a running server never reads a partial file
+    os.makedirs(os.path.dirname(os.path.abspath(output)), exist_ok=True)
+    tmp_path = f"{output}.tmp"
+    with open(tmp_path, 'wb') as f:
+        pickle.dump(artifact, f, protocol=pickle.HIGHEST_PROTOCOL)
+    os.replace(tmp_path, output)
+    return artifact
+
+
+class AdmissionModel:
+    def __init__(self, path=MODEL_PATH, check_interval=CHECK_INTERVAL):
+        self.path = path
+        self.check_interval = check_interval
+        self.reloads = 0
+        self._artifact = None
+        self._mtime = None
+        self._next_check = 0.0
+        self._lock = threading.Lock()
+
+    @property
+    def ready(self):
+        return self._artifact is not None
+
+    @property
+    def version(self):
+        artifact = self.current()
+        return artifact['version'] if artifact is not None else None
+
+    def current(self):
+        if time.monotonic() >= self._next_check:
+            self.refresh()
+        return self._artifact
+
+    def refresh(self):
+        # One thread checks the file; the rest keep using the loaded model
+        if not self._lock.acquire(blocking=False):
+            return False
+        try:
+            self._next_check = time.monotonic() + self.check_interval
+            try:
+                mtime = os.stat(self.path).st_mtime_ns
+            except FileNotFoundError:
+                return False
+            if mtime == self._mtime:
+                return False
+
+            try:
+                with open(self.path, 'rb') as f:
+                    artifact = pickle.load(f)
+                if tuple(artifact['features']) != FEATURES:
+                    raise ValueError(f"expects features {artifact['features']}")
+            except Exception as e:
+                # Keep serving the previous model (or the heuristic)
+                print(f"Admission model not loaded: {e}")
+                self._mtime = mtime
+                return False
+
+            # The artifact and its scorer are swapped in one reference assignment
+            self._artifact = dict(artifact, scorer=linear_scorer(artifact['model']))
+            self._mtime = mtime
+            self.reloads += 1
+            return True
+        finally:
+            self._lock.release()
+
+    def predict(self, colleges, responses):
+        # One probability per college, or None when the heuristic should be used
+        artifact = self.current()
+        percentage = academic_percentage(responses)
+        if artifact is None or percentage is None or not colleges:
+            return None
+
+        X = np.array([[percentage] + college_features(college) for college in colleges])
+        if artifact['scorer'] is not None:
+            weights, bias = artifact['scorer']
+            probabilities = 1.0 / (1.0 + np.exp(-(X @ weights + bias)))
+        else:
+            probabilities = artifact['model'].predict_proba(X)[:, 1]
+        return np.clip(probabilities, *PROBABILITY_RANGE).round(4).tolist()
+
+    def apply(self, recommendations, colleges, responses):
+        try:
+            probabilities = self.predict(colleges, responses)
+        except Exception as e:
+            print(f"Admission model prediction failed: {e}")
+            probabilities = None
+
+        if probabilities is None:
+            for recommendation, college in zip(recommendations, colleges):
+                recommendation['admission_probability'] = calculate_admission_probability(college)
+        else:
+            for recommendation, probability in zip(recommendations, probabilities):
+                recommendation['admission_probability'] = probability
+        return recommendations
+
+    def stats(self):
+        artifact = self._artifact
+        if artifact is None:
+            return {"loaded": False, "path": self.path}
+        return {
+            "loaded": True,
+            "path": self.path,
+            "version": artifact['version'],
+            "trained_at": artifact['trained_at'],
+            "training_rows": artifact['training_rows'],
+            "reloads": self.reloads
+        }
+
+
+admission_model = AdmissionModel()
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Train the admission probability model")
+    parser.add_argument('--train', action='store_true', help="Train and write the model artifact")
+    parser.add_argument('--csv', default=TRAINING_CSV, help=f"Training data (default: {TRAINING_CSV})")
+    parser.add_argument('--output', default=MODEL_PATH, help=f"Artifact path (default: {MODEL_PATH})")
+    args = parser.parse_args()
+
+    if not args.train:
+        parser.print_help()
+    else:
+        print("🤖 TRAINING ADMISSION MODEL")
+        print("=" * 40)
+        artifact = train_model(args.csv, args.output)
+        print(f"✅ Trained on {artifact['training_rows']} rows "
+              f"(training accuracy {artifact['training_accuracy']:.0%})")
+        print(f"✅ Saved model {artifact['version']} to {args.output}")
@@ -0,0 +1,349 @@
+#!/usr/bin/env python3
+"""
+Assessment Analytics Rollups
+Career Guidance System
+
+Daily counts per Holland code, per recommended course and per region of the
+recommended colleges. The assessment writer adds each committed batch to the
+rollups in the same transaction, so /api/analytics/* reads a few rows per day
+instead of scanning assessments. Regions come from the recommended colleges;
+assessments do not record where the student lives.
+
+    python analytics.py --backfill
+"""
+
+import argparse
+import json
+import sqlite3
+import zlib
+from collections import Counter
+from datetime import date, datetime, timedelta
+
+from assessment_store import ASSESSMENT_COLUMNS
+from catalog import catalog
+from db import DB_PATH
+
+ROLLUP_TABLES = ('analytics_holland_daily', 'analytics_course_daily', 'analytics_region_daily')
+
+# Window used when a request gives no dates
+DEFAULT_DAYS = 30
+MAX_RANGE_DAYS = 3660
+
+HOLLAND_UPSERT_SQL = '''
+    INSERT INTO analytics_holland_daily (day, holland_code, assessments) VALUES (?, ?, ?)
+    ON CONFLICT (day, holland_code) DO UPDATE SET assessments = assessments + excluded.assessments
+'''
+COURSE_UPSERT_SQL = '''
+    INSERT INTO analytics_course_daily (day, course, recommended, top_choice) VALUES (?, ?, ?, ?)
+    ON CONFLICT (day, course) DO UPDATE SET
+        recommended = recommended + excluded.recommended,
+        top_choice = top_choice + excluded.top_choice
+'''
+REGION_UPSERT_SQL = '''
+    INSERT INTO analytics_region_daily (day, region, assessments) VALUES (?, ?, ?)
+    ON CONFLICT (day, region) DO UPDATE SET assessments = assessments + excluded.assessments
+'''
+
+# Counts of a stored assessment, taken back out when a resubmit replaces it
+STORED_ROLLUP_SQL = '''
+    SELECT date(created_at), holland_code, courses, colleges, legacy_recommendations
+    FROM assessments WHERE session_id = ?
+'''
+
+# Rows a resubmit brought down to zero; a backfill would not have them
+PRUNE_SQL = {
+    'analytics_holland_daily': "DELETE FROM analytics_holland_daily WHERE day = ? AND holland_code = ? AND assessments = 0",
+    'analytics_course_daily': "DELETE FROM analytics_course_daily WHERE day = ? AND course = ? AND recommended = 0",
+    'analytics_region_daily': "DELETE FROM analytics_region_daily WHERE day = ? AND region = ? AND assessments = 0",
+}
+
+# Range reads on the (day, ...) primary keys
+HOLLAND_REPORT_SQL = '''
+    SELECT day, holland_code, assessments FROM analytics_holland_daily
+    WHERE day BETWEEN ? AND ? ORDER BY day, holland_code
+'''
+COURSE_REPORT_SQL = '''
+    SELECT day, course, recommended, top_choice FROM analytics_course_daily
+    WHERE day BETWEEN ? AND ? ORDER BY day, course
+'''
+REGION_REPORT_SQL = '''
+    SELECT day, region, assessments FROM analytics_region_daily
+    WHERE day BETWEEN ? AND ? ORDER BY day, region
+'''
+
+_COLUMN = {name: i for i, name in enumerate(ASSESSMENT_COLUMNS)}
+
+
+def create_rollup_tables(conn):
+    conn.execute('''
+        CREATE TABLE IF NOT EXISTS analytics_holland_daily (
+            day TEXT NOT NULL,
+            holland_code TEXT NOT NULL,
+            assessments INTEGER NOT NULL,
+            PRIMARY KEY (day, holland_code)
+        ) WITHOUT ROWID
+    ''')
+    conn.execute('''
+        CREATE TABLE IF NOT EXISTS analytics_course_daily (
+            day TEXT NOT NULL,
+            course TEXT NOT NULL,
+            recommended INTEGER NOT NULL,
+            top_choice INTEGER NOT NULL,
+            PRIMARY KEY (day, course)
+        ) WITHOUT ROWID
+    ''')
+    conn.execute('''
+        CREATE TABLE IF NOT EXISTS analytics_region_daily (
+            day TEXT NOT NULL,
+            region TEXT NOT NULL,
+            assessments INTEGER NOT NULL,
+            PRIMARY KEY (day, region)
+        ) WITHOUT ROWID
+    ''')
+
+
+class Rollup:
+    # Counts for a set of assessments, flushed with one upsert per key
+    def __init__(self):
+        self.holland = Counter()
+        self.recommended = Counter()
+        self.top_choice = Counter()
+        self.regions = Counter()
+
+    def add(self, day, holland_code, courses, colleges, legacy_recommendations, region_of, sign=1):
+        # courses/colleges are the stored reference JSON; rows stored in full
+        # (legacy_recommendations) are read from the response instead.
+        # sign=-1 takes a row's counts back out.
+        if legacy_recommendations is not None:
+            recommendations = json.loads(zlib.decompress(legacy_recommendations))
+            course_codes = [c.get('course') for c in recommendations.get('course_recommendations') or []]
+            # location is "<city>, <region>"
+            regions = {
+                c.get('location', '').rpartition(', ')[2]
+                for c in recommendations.get('college_recommendations') or []
+            }
+        else:
+            course_codes = [course[0] for course in json.loads(courses or '[]')]
+            regions = {region_of(college[0]) for college in json.loads(colleges or '[]')}
+
+        self.holland[(day, holland_code or '')] += sign
+        for rank, course in enumerate(course_codes):
+            if course:
+                self.recommended[(day, course)] += sign
+                if rank == 0:
+                    self.top_choice[(day, course)] += sign
+        for region in regions:
+            if region:
+                self.regions[(day, region)] += sign
+
+    def add_rows(self, day, rows, region_of):
+        # Rows in assessment_store.pack_assessment() layout
+        for row in rows:
+            self.add(day, row[_COLUMN['holland_code']], row[_COLUMN['courses']], row[_COLUMN['colleges']],
+                     row[_COLUMN['legacy_recommendations']], region_of)
+
+    def merge(self, other, sign=1):
+        for mine, theirs in ((self.holland, other.holland), (self.recommended, other.recommended),
+                             (self.top_choice, other.top_choice), (self.regions, other.regions)):
+            for key, count in theirs.items():
+                mine[key] += sign * count
+
+    def write(self, conn):
+        # Keys a resubmit cancelled out are skipped rather than written as 0
+        conn.executemany(HOLLAND_UPSERT_SQL, [key + (count,) for key, count in self.holland.items() if count])
+        conn.executemany(COURSE_UPSERT_SQL, [
+            key + (count, self.top_choice[key]) for key, count in self.recommended.items()
+            if count or self.top_choice[key]
+        ])
+        conn.executemany(REGION_UPSERT_SQL, [key + (count,) for key, count in self.regions.items() if count])
+        for table, counts in zip(ROLLUP_TABLES, (self.holland, self.recommended, self.regions)):
+            pruned = [key for key, count in counts.items() if count < 0]
+            if pruned:
+                conn.executemany(PRUNE_SQL[table], pruned)
+
+
+def record_assessments(conn, rows):
+    # AssessmentWriter hook: runs inside the transaction that stores the rows,
+    # before they are written. created_at defaults to CURRENT_TIMESTAMP, i.e.
+    # today in UTC.
+    by_id = catalog.snapshot().by_id
+
+    def region_of(college_id):
+        college = by_id.get(college_id)
+        return college['region'] if college else None
+
+    # A resubmitted session_id replaces its stored row (INSERT OR REPLACE):
+    # take that row's counts back out, and count only the last of several
+    # rows for one session in this batch
+    latest = {row[_COLUMN['session_id']]: row for row in rows}
+    rollup = Rollup()
+    for session_id in latest:
+        stored = conn.execute(STORED_ROLLUP_SQL, (session_id,)).fetchone()
+        if stored is not None:
+            rollup.add(*stored, region_of=region_of, sign=-1)
+    rollup.add_rows(datetime.utcnow().date().isoformat(), latest.values(), region_of)
+    rollup.write(conn)
+
+
+def count_assessments(conn, rollup, regions, after_id=0):
+    # Adds stored assessments with id > after_id; returns (count, last id)
+    cursor = conn.execute('''
+        SELECT id, date(created_at), holland_code, courses, colleges, legacy_recommendations
+        FROM assessments WHERE id > ? ORDER BY id
+    ''', (after_id,))
+    count = 0
+    last_id = after_id
+    while True:
+        rows = cursor.fetchmany(10000)
+        if not rows:
+            break
+        for last_id, day, holland_code, courses, colleges, legacy in rows:
+            rollup.add(day, holland_code, courses, colleges, legacy, regions.get)
+        count += len(rows)
+    return count, last_id
+
+
+def count_archived(rollup, regions, archive_rows):
+    count = 0
+    for row in archive_rows:
+        rollup.add(str(row['created_at'])[:10], row['holland_code'], row['courses'], row['colleges'],
+                   row['legacy_recommendations'], regions.get)
+        count += 1
+    return count
+
+
+def read_rollups(conn):
+    # The stored rollups as a Rollup, to diff two points in time
+    rollup = Rollup()
+    for day, holland_code, count in conn.execute("SELECT day, holland_code, assessments FROM analytics_holland_daily"):
+        rollup.holland[(day, holland_code)] = count
+    for day, course, recommended, top_choice in conn.execute(
+            "SELECT day, course, recommended, top_choice FROM analytics_course_daily"):
+        rollup.recommended[(day, course)] = recommended
+        rollup.top_choice[(day, course)] = top_choice
+    for day, region, count in conn.execute("SELECT day, region, assessments FROM analytics_region_daily"):
+        rollup.regions[(day, region)] = count
+    return rollup
+
+
+def replace_rollups(conn, rollup):
+    for table in ROLLUP_TABLES:
+        conn.execute(f"DELETE FROM {table}")
+    rollup.write(conn)
+
+
+def college_regions(conn):
+    return dict(conn.execute("SELECT id, region FROM colleges"))
+
+
+def backfill(conn):
+    # Rebuilds every rollup inside the caller's transaction (migrations)
+    create_rollup_tables(conn)
+    rollup = Rollup()
+    count, _ = count_assessments(conn, rollup, college_regions(conn))
+    replace_rollups(conn, rollup)
+    return count
+
+
+def date_range(start=None, end=None):
+    # Inclusive ISO dates; defaults to the last DEFAULT_DAYS days (UTC)
+    end_day = date.fromisoformat(end) if end else datetime.utcnow().date()
+    start_day = date.fromisoformat(start) if start else end_day - timedelta(days=DEFAULT_DAYS - 1)
+    if start_day > end_day:
+        raise ValueError("start must not be after end")
+    if (end_day - start_day).days >= MAX_RANGE_DAYS:
+        raise ValueError(f"Date range is limited to {MAX_RANGE_DAYS} days")
+    return start_day.isoformat(), end_day.isoformat()
+
+
+def _report(conn, sql, start, end, key, value_columns, daily, limit=None):
+    # Reads only the rollup rows inside [start, end]: cost grows with the
+    # number of days and categories, not with the number of assessments
+    cursor = conn.execute(sql, (start, end))
+    totals = {}
+    days = []
+    for day, name, *values in cursor:
+        counts = dict(zip(value_columns, values))
+        total = totals.setdefault(name, dict.fromkeys(value_columns, 0))
+        for column in value_columns:
+            total[column] += counts[column]
+        if daily:
+            days.append(dict({"day": day, key: name}, **counts))
+
+    ranked = sorted(totals.items(), key=lambda item: (-item[1][value_columns[0]], item[0]))
+    if limit is not None:
+        ranked = ranked[:limit]
+    report = {
+        "start": start,
+        "end": end,
+        "totals": [dict({key: name}, **counts) for name, counts in ranked]
+    }
+    if daily:
+        report['daily'] = days
+    return report
+
+
+def holland_code_report(conn, start, end, daily=False):
+    report = _report(conn, HOLLAND_REPORT_SQL, start, end, 'holland_code', ('assessments',), daily)
+    report['assessments'] = sum(row['assessments'] for row in report['totals'])
+    return report
+
+
+def course_report(conn, start, end, daily=False, limit=None):
+    return _report(conn, COURSE_REPORT_SQL, start, end, 'course', ('recommended', 'top_choice'), daily, limit)
+
+
+def region_report(conn, start, end, daily=False):
+    return _report(conn, REGION_REPORT_SQL, start, end, 'region', ('assessments',), daily)
+
+
+if __name__ == "__main__":
+    from assessment_archive import ARCHIVE_DIR, iter_archive
+
+    parser = argparse.ArgumentParser(description="Rebuild the assessment analytics rollups")
+    parser.add_argument('--db', default=DB_PATH, help="SQLite database file")
+    parser.add_argument('--backfill', action='store_true', help="Recount every rollup from the stored assessments")
+    parser.add_argument('--include-archive', action='store_true',
+                        help="Also count assessments archived to segment files")
+    parser.add_argument('--archive-dir', default=ARCHIVE_DIR, help=f"Segment directory (default: {ARCHIVE_DIR})")
+    args = parser.parse_args()
+
+    if not args.backfill:
+        parser.print_help()
+    else:
+        print("📊 ANALYTICS BACKFILL")
+        print("=" * 40)
+        conn = sqlite3.connect(args.db, isolation_level=None)
+        try:
+            conn.execute("PRAGMA busy_timeout = 5000")
+            create_rollup_tables(conn)
+            regions = college_regions(conn)
+            rollup = Rollup()
+
+            # The long scan runs without the write lock, inside one read
+            # transaction: it and the rollups read at its start see the same
+            # snapshot, while the API keeps storing (and counting) assessments
+            conn.execute("BEGIN")
+            try:
+                before = read_rollups(conn)
+                count, _ = count_assessments(conn, rollup, regions)
+            finally:
+                conn.execute("COMMIT")
+            if args.include_archive:
+                count += count_archived(rollup, regions, iter_archive(args.archive_dir))
+
+            # Then, holding the write lock, add what the writer counted since
+            # the snapshot - new rows, minus the rows resubmits replaced - and
+            # swap the rollups in one transaction
+            conn.execute("BEGIN IMMEDIATE")
+            try:
+                rollup.merge(read_rollups(conn))
+                rollup.merge(before, sign=-1)
+                replace_rollups(conn, rollup)
+                conn.execute("COMMIT")
+            except Exception:
+                conn.execute("ROLLBACK")
+                raise
+        finally:
+            conn.close()
+        print(f"✅ Rebuilt rollups from {count} assessments plus the writes made during the scan")
@@ -0,0 +1,142 @@
+#!/usr/bin/env python3
+"""
+Assessment Retention and Archival
+Career Guidance System
+
+Moves assessments older than the retention window out of the database into
+gzip-compressed JSON Lines segment files, one row per line in the compact
+storage format (assessment_store.py). A segment is written and fsynced
+before its rows are deleted, so an interrupted run leaves at worst a
+duplicate, never a loss.
+
+    python assessment_archive.py --days 365 --vacuum
+"""
+
+import argparse
+import base64
+import glob
+import gzip
+import json
+import os
+import sqlite3
+from datetime import datetime, timedelta
+
+from db import DB_PATH
+
+RETENTION_DAYS = int(os.environ.get('CAREER_RETENTION_DAYS', '365'))
+ARCHIVE_DIR = os.environ.get('CAREER_ARCHIVE_DIR', 'archive')
+SEGMENT_ROWS = int(os.environ.get('CAREER_ARCHIVE_SEGMENT_ROWS', '50000'))
+
+SEGMENT_PATTERN = 'assessments-*.jsonl.gz'
+
+# created_at is indexed (migration 3), so this range scan stays cheap on a large table
+EXPIRED_ASSESSMENTS_SQL = '''
+    SELECT * FROM assessments
+    WHERE created_at < ?
+    ORDER BY created_at, id
+    LIMIT ?
+'''
+
+
+def retention_cutoff(days, now=None):
+    # created_at is SQLite CURRENT_TIMESTAMP: UTC, 'YYYY-MM-DD HH:MM:SS'
+    return ((now or datetime.utcnow()) - timedelta(days=days)).strftime('%Y-%m-%d %H:%M:%S')
+
+
+def _encode(row):
+    legacy = row.get('legacy_recommendations')
+    if legacy is not None:
+        row = dict(row, legacy_recommendations=base64.b64encode(legacy).decode('ascii'))
+    return json.dumps(row, separators=(',', ':')) + '\n'
+
+
+def _decode(line):
+    row = json.loads(line)
+    if row.get('legacy_recommendations') is not None:
+        row['legacy_recommendations'] = base64.b64decode(row['legacy_recommendations'])
+    return row
+
+
+def write_segment(rows, directory):
+    ids = [row['id'] for row in rows]
+    path = os.path.join(directory, f"assessments-{min(ids):010d}-{max(ids):010d}.jsonl.gz")
+    tmp_path = f"{path}.tmp"
+    with open(tmp_path, 'wb') as raw:
+        with gzip.GzipFile(fileobj=raw, mode='wb', compresslevel=9, mtime=0) as f:
+            for row in rows:
+                f.write(_encode(row).encode('utf-8'))
+        raw.flush()
+        os.fsync(raw.fileno())
+    os.replace(tmp_path, path)
+    return path
+
+
+def iter_archive(directory=ARCHIVE_DIR):
+    # Archived rows, segment by segment, as dicts accepted by unpack_assessment()
+    for path in sorted(glob.glob(os.path.join(directory, SEGMENT_PATTERN))):
+        with gzip.open(path, 'rt', encoding='utf-8') as f:
+            for line in f:
+                yield _decode(line)
+
+
+def archive_assessments(db_path=DB_PATH, days=RETENTION_DAYS, directory=ARCHIVE_DIR,
+                        segment_rows=SEGMENT_ROWS, dry_run=False, vacuum=False, verbose=False):
+    cutoff = retention_cutoff(days)
+    summary = {"cutoff": cutoff, "rows": 0, "segments": []}
+
+    conn = sqlite3.connect(db_path)
+    try:
+        conn.execute("PRAGMA busy_timeout = 5000")
+        if dry_run:
+            summary['rows'] = conn.execute(
+                "SELECT COUNT(*) FROM assessments WHERE created_at < ?", (cutoff,)
+            ).fetchone()[0]
+            return summary
+
+        os.makedirs(directory, exist_ok=True)
+        while True:
+            cursor = conn.execute(EXPIRED_ASSESSMENTS_SQL, (cutoff, segment_rows))
+            columns = [desc[0] for desc in cursor.description]
+            rows = [dict(zip(columns, row)) for row in cursor.fetchall()]
+            if not rows:
+                break
+
+            path = write_segment(rows, directory)
+            with conn:
+                conn.executemany("DELETE FROM assessments WHERE id = ?", [(row['id'],) for row in rows])
+
+            summary['rows'] += len(rows)
+            summary['segments'].append(path)
+            if verbose:
+                print(f"📦 Archived {len(rows)} assessments to {path} ({os.path.getsize(path):,} bytes)")
+
+        if vacuum and summary['rows']:
+            # Returns the freed pages to the filesystem; needs free disk space
+            # roughly the size of the database
+            conn.execute("VACUUM")
+    finally:
+        conn.close()
+    return summary
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Archive old assessments into compressed segment files")
+    parser.add_argument('--db', default=DB_PATH, help="SQLite database file")
+    parser.add_argument('--days', type=int, default=RETENTION_DAYS,
+                        help=f"Keep assessments newer than this many days (default: {RETENTION_DAYS})")
+    parser.add_argument('--dir', default=ARCHIVE_DIR, help=f"Segment directory (default: {ARCHIVE_DIR})")
+    parser.add_argument('--segment-rows', type=int, default=SEGMENT_ROWS,
+                        help=f"Rows per segment file (default: {SEGMENT_ROWS})")
+    parser.add_argument('--vacuum', action='store_true', help="VACUUM the database afterwards to shrink the file")
+    parser.add_argument('--dry-run', action='store_true', help="Only count the assessments that would be archived")
+    args = parser.parse_args()
+
+    print("🗄️  ASSESSMENT RETENTION")
+    print("=" * 40)
+    summary = archive_assessments(args.db, args.days, args.dir, args.segment_rows,
+                                  dry_run=args.dry_run, vacuum=args.vacuum, verbose=True)
+    if args.dry_run:
+        print(f"📋 {summary['rows']} assessments older than {summary['cutoff']} would be archived")
+    else:
+        print(f"✅ Archived {summary['rows']} assessments older than {summary['cutoff']} "
+              f"in {len(summary['segments'])} segments")
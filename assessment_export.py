@@ -0,0 +1,224 @@
+#!/usr/bin/env python3
+"""
+Streaming Assessment Export
+Career Guidance System
+
+Streams assessments from a server-side cursor in fixed-size chunks as CSV,
+Arrow IPC or Parquet (the last two when pyarrow is installed). The RIASEC
+scores are one column each and the recommendations are flattened to course
+codes and college ids, so memory stays flat however many rows are exported.
+
+    python assessment_export.py --format parquet --start 2025-06-01 --end 2025-06-30 -o june.parquet
+"""
+
+import argparse
+import csv
+import io
+import json
+import os
+import sqlite3
+import sys
+import time
+import zlib
+from datetime import date, timedelta
+
+from assessment_store import SCORE_COLUMNS
+from db import DB_PATH
+
+try:
+    import pyarrow as pa
+    import pyarrow.parquet as pq
+except ImportError:
+    pa = pq = None
+
+EXPORT_CHUNK_ROWS = int(os.environ.get('CAREER_EXPORT_CHUNK_ROWS', '10000'))
+
+# format -> (content type, file extension, needs pyarrow)
+EXPORT_FORMATS = {
+    'csv': ('text/csv; charset=utf-8', 'csv', False),
+    'arrow': ('application/vnd.apache.arrow.stream', 'arrows', True),
+    'parquet': ('application/vnd.apache.parquet', 'parquet', True),
+}
+
+EXPORT_COLUMNS = (
+    ('id', 'session_id', 'student_name', 'created_at', 'holland_code') + SCORE_COLUMNS
+    + ('top_course', 'recommended_courses', 'recommended_college_ids', 'catalog_version')
+)
+
+# Multi-valued columns are joined with this separator
+LIST_SEPARATOR = ';'
+
+
+def export_query(start=None, end=None):
+    # start/end are inclusive ISO dates. A date range walks the created_at
+    # index (whose entries are already in (created_at, id) order), so
+    # neither form needs a sort.
+    sql = f'''
+        SELECT id, session_id, student_name, created_at, holland_code, {", ".join(SCORE_COLUMNS)},
+               courses, colleges, catalog_version, legacy_recommendations
+        FROM assessments
+    '''
+    conditions = []
+    params = []
+    if start:
+        conditions.append("created_at >= ?")
+        params.append(date.fromisoformat(start).isoformat())
+    if end:
+        conditions.append("created_at < ?")
+        params.append((date.fromisoformat(end) + timedelta(days=1)).isoformat())
+    if conditions:
+        sql += " WHERE " + " AND ".join(conditions) + " ORDER BY created_at, id"
+    else:
+        sql += " ORDER BY id"
+    return sql, params
+
+
+def export_row(row):
+    *values, courses, colleges, catalog_version, legacy = row
+    if legacy is not None:
+        recommendations = json.loads(zlib.decompress(legacy))
+        course_codes = [c.get('course') for c in recommendations.get('course_recommendations') or []]
+        college_ids = []
+    else:
+        course_codes = [course[0] for course in json.loads(courses or '[]')]
+        college_ids = [str(college[0]) for college in json.loads(colleges or '[]')]
+
+    return tuple(values) + (
+        course_codes[0] if course_codes else None,
+        LIST_SEPARATOR.join(c for c in course_codes if c),
+        LIST_SEPARATOR.join(college_ids),
+        catalog_version
+    )
+
+
+def export_chunks(conn, sql, params, chunk_rows=EXPORT_CHUNK_ROWS):
+    cursor = conn.execute(sql, params)
+    while True:
+        rows = cursor.fetchmany(chunk_rows)
+        if not rows:
+            return
+        yield [export_row(row) for row in rows]
+
+
+def csv_stream(chunks):
+    buffer = io.StringIO()
+    writer = csv.writer(buffer)
+    writer.writerow(EXPORT_COLUMNS)
+    for chunk in chunks:
+        writer.writerows(chunk)
+        yield buffer.getvalue().encode('utf-8')
+        buffer.seek(0)
+        buffer.truncate()
+    # Header only, for an empty export
+    if buffer.tell():
+        yield buffer.getvalue().encode('utf-8')
+
+
+def arrow_schema():
+    return pa.schema(
+        [('id', pa.int64()), ('session_id', pa.string()), ('student_name', pa.string()),
+         ('created_at', pa.timestamp('s')), ('holland_code', pa.string())]
+        + [(column, pa.float64()) for column in SCORE_COLUMNS]
+        + [('top_course', pa.string()), ('recommended_courses', pa.string()),
+           ('recommended_college_ids', pa.string()), ('catalog_version', pa.string())]
+    )
+
+
+class _ChunkSink:
+    # File-like target for the pyarrow writers; drained after every batch
+    def __init__(self):
+        self.parts = []
+        self.closed = False
+
+    def write(self, data):
+        self.parts.append(bytes(data))
+        return len(data)
+
+    def flush(self):
+        pass
+
+    def close(self):
+        self.closed = True
+
+    def drain(self):
+        data = b''.join(self.parts)
+        self.parts = []
+        return data
+
+
+def arrow_stream(chunks, export_format):
+    schema = arrow_schema()
+    sink = _ChunkSink()
+    target = pa.PythonFile(sink, mode='w')
+    if export_format == 'parquet':
+        writer = pq.ParquetWriter(target, schema, compression='zstd')
+    else:
+        writer = pa.ipc.new_stream(target, schema)
+
+    for chunk in chunks:
+        columns = list(zip(*chunk))
+        arrays = [
+            pa.array(values).cast(field.type) if field.name == 'created_at' else pa.array(values, type=field.type)
+            for field, values in zip(schema, columns)
+        ]
+        # One record batch / row group per chunk, handed on as soon as written
+        writer.write_batch(pa.RecordBatch.from_arrays(arrays, schema=schema))
+        data = sink.drain()
+        if data:
+            yield data
+
+    writer.close()
+    yield sink.drain()
+
+
+def check_export(export_format='csv', start=None, end=None):
+    # Raises ValueError for a bad request before anything is streamed
+    if export_format not in EXPORT_FORMATS:
+        raise ValueError(f"format must be one of: {', '.join(EXPORT_FORMATS)}")
+    if EXPORT_FORMATS[export_format][2] and pa is None:
+        raise ValueError(f"{export_format} export needs pyarrow installed")
+    return export_query(start, end)
+
+
+def export_stream(conn, export_format='csv', start=None, end=None, chunk_rows=EXPORT_CHUNK_ROWS):
+    # Bytes for the whole export, produced one chunk at a time
+    sql, params = check_export(export_format, start, end)
+    chunks = export_chunks(conn, sql, params, chunk_rows)
+    if export_format == 'csv':
+        return csv_stream(chunks)
+    return arrow_stream(chunks, export_format)
+
+
+def export_filename(export_format, start=None, end=None):
+    return f"assessments_{start or 'all'}_{end or 'latest'}.{EXPORT_FORMATS[export_format][1]}"
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Export assessments as CSV, Arrow IPC or Parquet")
+    parser.add_argument('--db', default=DB_PATH, help="SQLite database file")
+    parser.add_argument('--format', default='csv', choices=list(EXPORT_FORMATS))
+    parser.add_argument('--start', help="First day to include (YYYY-MM-DD, UTC)")
+    parser.add_argument('--end', help="Last day to include (YYYY-MM-DD, UTC)")
+    parser.add_argument('-o', '--output', default='-', help="Output file (default: stdout)")
+    parser.add_argument('--chunk-rows', type=int, default=EXPORT_CHUNK_ROWS,
+                        help=f"Rows fetched and written per chunk (default: {EXPORT_CHUNK_ROWS})")
+    args = parser.parse_args()
+
+    started = time.perf_counter()
+    conn = sqlite3.connect(args.db)
+    out = sys.stdout.buffer if args.output == '-' else open(args.output, 'wb')
+    written = 0
+    try:
+        for data in export_stream(conn, args.format, args.start, args.end, args.chunk_rows):
+            out.write(data)
+            written += len(data)
+    except ValueError as e:
+        parser.error(str(e))
+    finally:
+        if out is not sys.stdout.buffer:
+            out.close()
+        conn.close()
+
+    # Progress goes to stderr so stdout can be piped
+    print(f"✅ Exported {written:,} bytes of {args.format} in {time.perf_counter() - started:.1f}s",
+          file=sys.stderr)
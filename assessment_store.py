@@ -0,0 +1,162 @@
+#!/usr/bin/env python3
+"""
+Compact Assessment Storage
+Career Guidance System
+
+Assessments are stored as references rather than the full API response:
+the six scores as numeric columns, RIASEC answers as one digit per
+question, the recommended courses as [course, match_score, type] and the
+recommended colleges as [college_id, admission_probability], plus the
+catalog version they were drawn from. complete_api rehydrates them into
+the original response shape on read.
+"""
+
+import json
+import re
+import zlib
+
+from batch_scoring import RIASEC_TYPES, TYPE_INDEX
+
+SCORE_COLUMNS = tuple(f"score_{t.lower()}" for t in RIASEC_TYPES)
+
+ASSESSMENT_COLUMNS = (
+    ('session_id', 'student_name', 'holland_code') + SCORE_COLUMNS
+    + ('riasec_answers', 'quiz_answers', 'courses', 'colleges', 'catalog_version', 'legacy_recommendations')
+)
+
+CREATE_ASSESSMENTS_SQL = f'''
+    CREATE TABLE IF NOT EXISTS {{table}} (
+        id INTEGER PRIMARY KEY AUTOINCREMENT,
+        session_id TEXT UNIQUE NOT NULL,
+        student_name TEXT,
+        holland_code TEXT,
+        {", ".join(f"{column} REAL" for column in SCORE_COLUMNS)},
+        riasec_answers TEXT,
+        quiz_answers TEXT,
+        courses TEXT,
+        colleges TEXT,
+        catalog_version TEXT,
+        legacy_recommendations BLOB,
+        created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
+    )
+'''
+
+INSERT_ASSESSMENT_SQL = f'''
+    INSERT OR REPLACE INTO assessments
+    ({", ".join(ASSESSMENT_COLUMNS)})
+    VALUES ({", ".join("?" for _ in ASSESSMENT_COLUMNS)})
+'''
+
+SELECT_ASSESSMENT_SQL = 'SELECT * FROM assessments WHERE session_id = ?'
+
+# RIASEC question ids (R1, I1, ... C5) map to one character each, in
+# question-number-then-type order; '-' marks an unanswered slot
+RIASEC_QUESTION_ID = re.compile(r'^([RIASEC])([1-9][0-9]?)$')
+UNANSWERED = '-'
+
+# Responses stored before course entries carried their personality_type
+# give it only in the reason, "Strong match with your Social (Helper)
+# personality"; the description starts with the type's name
+COURSE_REASON_PREFIX = 'Strong match with your '
+
+
+def _dumps(value):
+    return json.dumps(value, separators=(',', ':'), default=str)
+
+
+def pack_responses(responses):
+    # Returns (riasec_answers, quiz_answers); ratings outside 0-9 and every
+    # other question go into quiz_answers as JSON
+    slots = []
+    rest = {}
+    for question_id, answer in (responses or {}).items():
+        match = RIASEC_QUESTION_ID.match(str(question_id))
+        if match and type(answer) is int and 0 <= answer <= 9:
+            position = (int(match.group(2)) - 1) * len(RIASEC_TYPES) + TYPE_INDEX[match.group(1)]
+            if position >= len(slots):
+                slots.extend(UNANSWERED * (position + 1 - len(slots)))
+            slots[position] = str(answer)
+        else:
+            rest[question_id] = answer
+    return ''.join(slots) or None, _dumps(rest) if rest else None
+
+
+def unpack_responses(riasec_answers, quiz_answers):
+    responses = {}
+    for position, answer in enumerate(riasec_answers or ''):
+        if answer != UNANSWERED:
+            number, type_index = divmod(position, len(RIASEC_TYPES))
+            responses[f"{RIASEC_TYPES[type_index]}{number + 1}"] = int(answer)
+    if quiz_answers:
+        responses.update(json.loads(quiz_answers))
+    return responses
+
+
+def reason_type(reason):
+    reason = reason or ''
+    return reason[len(COURSE_REASON_PREFIX):][:1] if reason.startswith(COURSE_REASON_PREFIX) else None
+
+
+def course_refs(course_recommendations):
+    refs = []
+    for course in course_recommendations:
+        personality_type = course.get('personality_type') or reason_type(course.get('reason'))
+        if personality_type not in TYPE_INDEX:
+            return None
+        refs.append([course['course'], course['match_score'], personality_type])
+    return refs
+
+
+def college_refs(college_recommendations, college_id=None):
+    # Entries carry the id of the college row they were built from; for
+    # older entries without one, college_id(recommendation) -> id or None.
+    # Any unknown college means the list cannot be stored as references.
+    refs = []
+    for college in college_recommendations:
+        found = college.get('college_id')
+        if found is None and college_id is not None:
+            found = college_id(college)
+        if found is None:
+            return None
+        refs.append([found, college['admission_probability']])
+    return refs
+
+
+def pack_assessment(session_id, student_name, riasec_scores, holland_code, responses, recommendations,
+                    catalog_version, college_id=None):
+    riasec_answers, quiz_answers = pack_responses(responses)
+    courses = course_refs(recommendations.get('course_recommendations') or [])
+    colleges = college_refs(recommendations.get('college_recommendations') or [], college_id)
+
+    if courses is None or colleges is None:
+        # Not expressible as references: keep the full response, compressed
+        legacy = zlib.compress(_dumps(recommendations).encode('utf-8'))
+        courses = colleges = catalog_version = None
+    else:
+        legacy = None
+        courses, colleges = _dumps(courses), _dumps(colleges)
+
+    scores = tuple(float((riasec_scores or {}).get(t) or 0) for t in RIASEC_TYPES)
+    return (session_id, student_name, holland_code) + scores + (
+        riasec_answers, quiz_answers, courses, colleges, catalog_version, legacy
+    )
+
+
+def unpack_assessment(row):
+    # Stored row (a dict) -> plain values; recommendations stay as references
+    record = {
+        "id": row['id'],
+        "session_id": row['session_id'],
+        "student_name": row['student_name'],
+        "holland_code": row['holland_code'],
+        "riasec_scores": {t: row[column] for t, column in zip(RIASEC_TYPES, SCORE_COLUMNS)},
+        "responses": unpack_responses(row['riasec_answers'], row['quiz_answers']),
+        "courses": json.loads(row['courses']) if row['courses'] else [],
+        "colleges": json.loads(row['colleges']) if row['colleges'] else [],
+        "catalog_version": row['catalog_version'],
+        "created_at": row['created_at'],
+        "legacy_recommendations": None
+    }
+    if row['legacy_recommendations'] is not None:
+        record['legacy_recommendations'] = json.loads(zlib.decompress(row['legacy_recommendations']))
+    return record
@@ -0,0 +1,207 @@
+#!/usr/bin/env python3
+"""
+Write-Behind Assessment Storage
+Career Guidance System
+"""
+
+import atexit
+import os
+import queue
+import threading
+import time
+
+from db import pool
+from metrics import metrics
+
+WRITER_QUEUE_SIZE = int(os.environ.get('CAREER_WRITER_QUEUE_SIZE', '10000'))
+WRITER_BATCH_SIZE = int(os.environ.get('CAREER_WRITER_BATCH_SIZE', '200'))
+WRITER_FLUSH_INTERVAL = float(os.environ.get('CAREER_WRITER_FLUSH_INTERVAL', '0.05'))
+WRITER_PUT_TIMEOUT = float(os.environ.get('CAREER_WRITER_PUT_TIMEOUT', '2.0'))
+
+_STOP = object()
+
+
+class AssessmentWriter:
+    # Request threads enqueue rows; one background thread drains the queue and
+    # group-commits them, so submits never wait on an fsync.
+    def __init__(self, sql, connection_pool=pool, max_queue=WRITER_QUEUE_SIZE,
+                 batch_size=WRITER_BATCH_SIZE, flush_interval=WRITER_FLUSH_INTERVAL,
+                 put_timeout=WRITER_PUT_TIMEOUT, on_commit=None):
+        self.sql = sql
+        # on_commit(conn, rows) runs inside the transaction that stores rows,
+        # just before they are written, so it still sees any rows they replace
+        self.on_commit = on_commit
+        self.pool = connection_pool
+        self.max_queue = max_queue
+        self.batch_size = batch_size
+        self.flush_interval = flush_interval
+        self.put_timeout = put_timeout
+        self._lock = threading.Lock()
+        self._pid = None
+        self._queue = None
+        self._thread = None
+        self._pending = 0
+        self._reset_stats()
+        atexit.register(self.stop)
+
+    def _reset_stats(self):
+        self.enqueued = 0
+        self.written = 0
+        self.failed = 0
+        self.batches = 0
+        self.backpressure_waits = 0
+        self.sync_writes = 0
+        self.max_depth = 0
+        self.commit_time = 0.0
+        self.max_commit_time = 0.0
+        self.last_commit_time = 0.0
+
+    def _ensure_started(self):
+        # Threads do not survive fork, so each worker process starts its own
+        if self._pid == os.getpid() and self._thread is not None:
+            return
+        with self._lock:
+            if self._pid == os.getpid() and self._thread is not None:
+                return
+            self._pid = os.getpid()
+            self._queue = queue.Queue(maxsize=self.max_queue)
+            self._pending = 0
+            self._reset_stats()
+            self._thread = threading.Thread(target=self._run, name='assessment-writer', daemon=True)
+            self._thread.start()
+
+    def submit(self, row):
+        self.submit_many([row])
+
+    def submit_many(self, rows):
+        # Rows submitted together are committed in the same transaction
+        rows = list(rows)
+        if not rows:
+            return
+        self._ensure_started()
+
+        try:
+            self._queue.put_nowait(rows)
+        except queue.Full:
+            with self._lock:
+                self.backpressure_waits += 1
+            try:
+                self._queue.put(rows, timeout=self.put_timeout)
+            except queue.Full:
+                # Writer is saturated: slow the caller down by writing inline
+                self._commit(rows)
+                with self._lock:
+                    self.sync_writes += 1
+                return
+
+        with self._lock:
+            self.enqueued += len(rows)
+            self._pending += len(rows)
+            self.max_depth = max(self.max_depth, self._pending)
+
+    def _run(self):
+        work = self._queue
+        while True:
+            item = work.get()
+            if item is _STOP:
+                work.task_done()
+                return
+
+            groups = [item]
+            size = len(item)
+            stopping = False
+            deadline = time.monotonic() + self.flush_interval
+            while size < self.batch_size:
+                remaining = deadline - time.monotonic()
+                if remaining <= 0:
+                    break
+                try:
+                    item = work.get(timeout=remaining)
+                except queue.Empty:
+                    break
+                if item is _STOP:
+                    stopping = True
+                    break
+                groups.append(item)
+                size += len(item)
+
+            self._commit([row for group in groups for row in group])
+            with self._lock:
+                self._pending -= size
+            for _ in groups:
+                work.task_done()
+
+            if stopping:
+                work.task_done()
+                return
+
+    def _commit(self, rows):
+        start = time.perf_counter()
+        try:
+            with self.pool.connection() as conn, conn, \
+                    metrics.timer('career_sqlite_query_duration_seconds', statement='assessment_insert_batch'):
+                if self.on_commit is not None:
+                    self.on_commit(conn, rows)
+                conn.executemany(self.sql, rows)
+            written, failed = len(rows), 0
+        except Exception as e:
+            # Retry row by row so one bad row does not drop the whole batch
+            print(f"Assessment batch write failed, retrying rows individually: {e}")
+            written, failed = 0, 0
+            for row in rows:
+                try:
+                    with self.pool.connection() as conn, conn:
+                        if self.on_commit is not None:
+                            self.on_commit(conn, [row])
+                        conn.execute(self.sql, row)
+                    written += 1
+                except Exception as row_error:
+                    print(f"Database storage error: {row_error}")
+                    failed += 1
+
+        elapsed = time.perf_counter() - start
+        with self._lock:
+            self.written += written
+            self.failed += failed
+            self.batches += 1
+            self.commit_time += elapsed
+            self.last_commit_time = elapsed
+            self.max_commit_time = max(self.max_commit_time, elapsed)
+
+    def flush(self):
+        if self._queue is not None and self._pid == os.getpid():
+            self._queue.join()
+
+    def stop(self, timeout=10.0):
+        if self._thread is None or self._pid != os.getpid() or not self._thread.is_alive():
+            return
+        self._queue.put(_STOP)
+        self._thread.join(timeout)
+        self._thread = None
+
+    def depth(self):
+        # Rows waiting to be written (a batch submit is one queue item)
+        return self._pending
+
+    def saturated(self):
+        # max_queue bounds queued items, not rows: full means the next
+        # submit has to wait or write inline
+        work = self._queue
+        return work is not None and self._pid == os.getpid() and work.full()
+
+    def stats(self):
+        with self._lock:
+            return {
+                "queue_depth": self._pending,
+                "max_queue_depth": self.max_depth,
+                "queue_capacity": self.max_queue,
+                "enqueued": self.enqueued,
+                "written": self.written,
+                "failed": self.failed,
+                "batches": self.batches,
+                "backpressure_waits": self.backpressure_waits,
+                "sync_writes": self.sync_writes,
+                "avg_commit_ms": round(self.commit_time / self.batches * 1000, 3) if self.batches else 0.0,
+                "last_commit_ms": round(self.last_commit_time * 1000, 3),
+                "max_commit_ms": round(self.max_commit_time * 1000, 3)
+            }
@@ -0,0 +1,395 @@
+#!/usr/bin/env python3
+"""
+Async (ASGI) Career Guidance API
+Career Guidance System
+
+Serves /api/health, /api/colleges, /api/colleges/nearby, /api/assessment/start,
+/api/assessment/submit and /api/assessment/<session_id>/similar with the same response shapes as complete_api, but
+on an event loop, so idle connections cost a coroutine instead of a thread.
+Catalog reads come from the in-memory snapshot; SQLite calls run on a small
+bounded executor.
+
+    python async_api.py --port 5000
+    uvicorn async_api:app --host 0.0.0.0 --port 5000
+"""
+
+import argparse
+import asyncio
+import json
+import os
+import uuid
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime
+from functools import partial
+from itertools import islice
+
+from starlette.applications import Starlette
+from starlette.middleware import Middleware
+from starlette.middleware.cors import CORSMiddleware
+from starlette.responses import Response, StreamingResponse
+from starlette.routing import Route
+from werkzeug.datastructures import MIMEAccept
+from werkzeug.http import parse_accept_header
+
+from db import pool
+from catalog import catalog, build_keyset_query, keyset_key
+from question_bank import question_bank
+from admission_model import admission_model
+from response_cache import CACHE_MAX_AGE
+from similar_students import profile_index, top_course, MAX_NEIGHBOURS
+from complete_api import (
+    response_cache, recommendation_cache, assessment_writer, encode_cursor, decode_cursor, build_recommendations,
+    assessment_row, calculate_riasec_scores, generate_holland_code, similar_students_body, nearby_colleges_body,
+    MAX_PAGE_SIZE, NDJSON_FETCH_SIZE, NEARBY_LIMIT
+)
+
+# One thread per pooled connection; more would only queue on the pool
+EXECUTOR_THREADS = int(os.environ.get('CAREER_ASYNC_EXECUTOR_THREADS', str(pool.size)))
+# Blocking jobs allowed in flight (running or queued) before callers wait
+EXECUTOR_MAX_PENDING = int(os.environ.get('CAREER_ASYNC_MAX_PENDING', '256'))
+
+executor = ThreadPoolExecutor(max_workers=EXECUTOR_THREADS, thread_name_prefix='career-sqlite')
+_slots = None
+
+
+async def run_blocking(func, *args):
+    global _slots
+    if _slots is None:
+        # Created lazily so it binds to the running loop
+        _slots = asyncio.Semaphore(EXECUTOR_MAX_PENDING)
+    async with _slots:
+        return await asyncio.get_running_loop().run_in_executor(executor, partial(func, *args))
+
+
+async def refresh_catalog():
+    # Change checks stat the DB file, so they run off the loop on a timer;
+    # request handlers only ever read catalog.current
+    while True:
+        try:
+            await run_blocking(catalog.refresh)
+        except Exception as e:
+            print(f"College catalog not loaded: {e}")
+        await asyncio.sleep(catalog.check_interval)
+
+
+def json_response(data, status_code=200, headers=None):
+    return Response(json_body(data), status_code=status_code, headers=headers, media_type='application/json')
+
+
+def json_body(data):
+    # Same encoding as Flask's jsonify outside debug mode
+    return (json.dumps(data, sort_keys=True, separators=(',', ':'), default=str) + '\n').encode('utf-8')
+
+
+def error_response(message, status_code=500):
+    return json_response({"status": "error", "message": message}, status_code)
+
+
+def int_arg(request, name, default=None):
+    try:
+        return int(request.query_params[name])
+    except (KeyError, ValueError):
+        return default
+
+
+def float_arg(request, name, default=None):
+    try:
+        return float(request.query_params[name])
+    except (KeyError, ValueError):
+        return default
+
+
+def wants_ndjson(request):
+    return parse_accept_header(request.headers.get('accept'), MIMEAccept).best == 'application/x-ndjson'
+
+
+def conditional_response(request, body, etag, last_modified=None):
+    headers = {
+        'ETag': f'"{etag}"',
+        'Cache-Control': f'public, max-age={CACHE_MAX_AGE}, must-revalidate'
+    }
+    if last_modified is not None:
+        headers['Last-Modified'] = datetime.utcfromtimestamp(last_modified).strftime('%a, %d %b %Y %H:%M:%S GMT')
+
+    if_none_match = request.headers.get('if-none-match', '')
+    if headers['ETag'] in [tag.strip().replace('W/', '', 1) for tag in if_none_match.split(',')]:
+        return Response(status_code=304, headers=headers)
+    return Response(body, headers=headers, media_type='application/json')
+
+
+async def health(request):
+    catalog_stats = catalog.stats()
+    db_exists = catalog_stats['ready']
+    college_count = catalog_stats['colleges']
+
+    # Same weak validator as the Flask route; pollers revalidate to a 304
+    etag = f"health-{catalog_stats['version']}-{int(db_exists)}"
+    headers = {'ETag': f'W/"{etag}"', 'Cache-Control': 'no-cache'}
+    if_none_match = request.headers.get('if-none-match', '')
+    if f'"{etag}"' in [tag.strip().replace('W/', '', 1) for tag in if_none_match.split(',')]:
+        return Response(status_code=304, headers=headers)
+
+    return json_response({
+        "status": "healthy" if db_exists and college_count > 0 else "initializing",
+        "system_ready": db_exists and college_count > 0,
+        "database_exists": db_exists,
+        "colleges_loaded": college_count,
+        "database_pool": pool.stats(),
+        "catalog": catalog_stats,
+        "response_cache": response_cache.stats(),
+        "recommendation_cache": recommendation_cache.stats(),
+        "assessment_writer": assessment_writer.stats(),
+        "admission_model": admission_model.stats(),
+        "profile_index": profile_index.stats(),
+        "timestamp": datetime.now().isoformat()
+    }, headers=headers)
+
+
+async def health_live(request):
+    return json_response({"status": "alive"})
+
+
+async def health_ready(request):
+    if not catalog.ready:
+        try:
+            await run_blocking(catalog.refresh)
+        except Exception as e:
+            print(f"College catalog not loaded: {e}")
+    catalog_stats = catalog.stats()
+    queue_depth = assessment_writer.depth()
+    ready = (catalog_stats['ready'] and catalog_stats['colleges'] > 0
+             and not assessment_writer.saturated())
+
+    return json_response({
+        "status": "ready" if ready else "not_ready",
+        "colleges_loaded": catalog_stats['colleges'],
+        "catalog_version": catalog_stats['version'],
+        "data_version": catalog_stats['data_version'],
+        "last_reload": catalog_stats['loaded_at'],
+        "writer_queue_depth": queue_depth
+    }, 200 if ready else 503)
+
+
+async def stream_colleges_ndjson(filters, sort, after, limit):
+    # Each fetchmany runs on the executor; the connection is held for the
+    # whole stream, exactly as in the Flask version
+    query, params = build_keyset_query(sort=sort, after=after, limit=limit, **filters)
+    conn = await run_blocking(pool.acquire)
+    try:
+        cursor = await run_blocking(conn.execute, query, params)
+        columns = [desc[0] for desc in cursor.description]
+        count = 0
+        last = None
+        while True:
+            rows = await run_blocking(cursor.fetchmany, NDJSON_FETCH_SIZE)
+            if not rows:
+                break
+            lines = []
+            for row in rows:
+                last = dict(zip(columns, row))
+                count += 1
+                lines.append(json.dumps(last, separators=(',', ':')) + '\n')
+            yield ''.join(lines)
+    finally:
+        pool.release(conn)
+
+    next_cursor = encode_cursor(sort, keyset_key(last, sort)) if last is not None and count == limit else None
+    yield json.dumps({"status": "success", "count": count, "next_cursor": next_cursor}) + '\n'
+
+
+async def get_colleges(request):
+    try:
+        params = request.query_params
+        limit = int_arg(request, 'limit', 50)
+        sort = params.get('sort', 'id')
+        cursor = params.get('cursor')
+
+        if sort not in ('id', 'fee'):
+            return error_response("sort must be 'id' or 'fee'", 400)
+
+        try:
+            after = decode_cursor(cursor, sort) if cursor else None
+        except ValueError as e:
+            return error_response(str(e), 400)
+
+        filters = {
+            "course_type": params.get('course_type') or None,
+            "region": params.get('region') or None,
+            "category": params.get('category') or None,
+            "is_government": int_arg(request, 'is_government'),
+            "max_fee": int_arg(request, 'max_fee') or None
+        }
+
+        if wants_ndjson(request):
+            return StreamingResponse(stream_colleges_ndjson(filters, sort, after, max(limit, 1)),
+                                     media_type='application/x-ndjson')
+
+        # Answered from the in-memory catalog indexes - no SQL per request
+        limit = min(max(limit, 1), MAX_PAGE_SIZE)
+        snapshot = catalog.current
+        cache_key = tuple(filters.values()) + (limit, sort, cursor)
+
+        entry = response_cache.get(snapshot.version, cache_key)
+        if entry is None:
+            results = list(islice(snapshot.select(sort=sort, after=after, **filters), limit))
+            next_cursor = encode_cursor(sort, keyset_key(results[-1], sort)) if len(results) == limit else None
+
+            entry = response_cache.put_body(snapshot.version, cache_key, json_body({
+                "status": "success",
+                "count": len(results),
+                "colleges": results,
+                "next_cursor": next_cursor
+            }))
+
+        body, etag = entry
+        return conditional_response(request, body, etag, snapshot.modified_at)
+
+    except Exception as e:
+        return error_response(str(e))
+
+
+async def start_assessment(request):
+    try:
+        try:
+            data = await request.json()
+        except ValueError:
+            data = None
+        if not isinstance(data, dict):
+            data = {}
+        session_id = data.get('session_id') or f"session_{datetime.now().strftime('%Y%m%d_%H%M%S')}_{str(uuid.uuid4())[:8]}"
+
+        headers = {'Vary': 'Accept-Encoding', 'X-Question-Bank-Version': question_bank.version}
+        if 'gzip' in parse_accept_header(request.headers.get('accept-encoding')):
+            headers['Content-Encoding'] = 'gzip'
+            body = question_bank.start_body_gzip(session_id)
+        else:
+            body = question_bank.start_body(session_id)
+        return Response(body, headers=headers, media_type='application/json')
+
+    except Exception as e:
+        return error_response(str(e))
+
+
+def store_assessment(session_id, student_name, riasec_scores, holland_code, responses, recommendations):
+    assessment_writer.submit(assessment_row(
+        session_id, student_name, riasec_scores, holland_code, responses, recommendations
+    ))
+
+
+async def submit_assessment(request):
+    try:
+        try:
+            data = await request.json()
+        except ValueError:
+            data = None
+        if not data:
+            return error_response("No data provided", 400)
+
+        session_id = data.get('session_id')
+        responses = data.get('responses', {})
+
+        if not responses:
+            return error_response("No responses provided", 400)
+
+        # Scoring is pure CPU on in-memory data, a few tens of microseconds
+        riasec_scores = calculate_riasec_scores(responses)
+        holland_code = generate_holland_code(riasec_scores)
+        # Recommendations read the catalog and admission model, whose change
+        # checks stat files and query the DB, so they stay off the loop
+        recommendations = await run_blocking(build_recommendations, session_id, riasec_scores, holland_code, responses)
+
+        # Usually a non-blocking enqueue, but under backpressure the writer
+        # waits or writes inline, so keep it off the loop
+        try:
+            await run_blocking(store_assessment, session_id, data.get('student_name', 'Anonymous'),
+                               riasec_scores, holland_code, responses, recommendations)
+        except Exception as db_error:
+            print(f"Database storage error: {db_error}")
+
+        profile_index.add(session_id, riasec_scores, holland_code, top_course(recommendations))
+
+        return json_response({
+            "status": "success",
+            "recommendations": recommendations
+        })
+
+    except Exception as e:
+        return error_response(str(e))
+
+
+async def nearby_colleges(request):
+    try:
+        params = request.query_params
+        try:
+            body = nearby_colleges_body(
+                float_arg(request, 'lat'),
+                float_arg(request, 'lon'),
+                params.get('city'),
+                params.get('region'),
+                float_arg(request, 'radius'),
+                params.get('course_type') or None,
+                min(max(int_arg(request, 'limit', NEARBY_LIMIT), 1), MAX_PAGE_SIZE),
+                # In-memory grid lookup on the loaded snapshot, without the
+                # change check; the background task keeps it current
+                snapshot=catalog.current
+            )
+        except ValueError as e:
+            return error_response(str(e), 400)
+        return json_response(body)
+
+    except Exception as e:
+        return error_response(str(e))
+
+
+async def similar_students(request):
+    try:
+        session_id = request.path_params['session_id']
+        k = min(max(int_arg(request, 'k', 10), 1), MAX_NEIGHBOURS)
+        # May catch up from the DB first, so it runs on the executor
+        result = await run_blocking(profile_index.similar, session_id, k)
+        if result is None:
+            return error_response("Assessment not found", 404)
+        return json_response(similar_students_body(session_id, k, result))
+
+    except Exception as e:
+        return error_response(str(e))
+
+
+async def start_background_tasks():
+    app.state.catalog_refresher = asyncio.get_running_loop().create_task(refresh_catalog())
+
+
+async def stop_background_tasks():
+    app.state.catalog_refresher.cancel()
+    await run_blocking(assessment_writer.flush)
+    executor.shutdown(wait=True)
+
+
+app = Starlette(
+    routes=[
+        Route('/api/health', health),
+        Route('/api/health/live', health_live),
+        Route('/api/health/ready', health_ready),
+        Route('/api/colleges', get_colleges),
+        Route('/api/colleges/nearby', nearby_colleges),
+        Route('/api/assessment/start', start_assessment, methods=['POST']),
+        Route('/api/assessment/submit', submit_assessment, methods=['POST']),
+        Route('/api/assessment/{session_id}/similar', similar_students),
+    ],
+    middleware=[Middleware(CORSMiddleware, allow_origins=['*'], allow_methods=['*'], allow_headers=['*'])],
+    on_startup=[start_background_tasks],
+    on_shutdown=[stop_background_tasks]
+)
+
+
+if __name__ == '__main__':
+    import uvicorn
+
+    parser = argparse.ArgumentParser(description="Run the async Career Guidance API")
+    parser.add_argument('--host', default='0.0.0.0')
+    parser.add_argument('--port', type=int, default=5000)
+    args = parser.parse_args()
+
+    print("🚀 Starting Async Career Guidance API...")
+    print(f"✅ API available at: http://{args.host}:{args.port}")
+    uvicorn.run(app, host=args.host, port=args.port, backlog=4096)
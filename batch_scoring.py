@@ -0,0 +1,108 @@
+#!/usr/bin/env python3
+"""
+Vectorized Batch RIASEC Scoring
+Career Guidance System
+"""
+
+import csv
+import io
+
+import numpy as np
+
+RIASEC_TYPES = ('R', 'I', 'A', 'S', 'E', 'C')
+TYPE_INDEX = {t: i for i, t in enumerate(RIASEC_TYPES)}
+MAX_RATING = 5
+
+
+def is_riasec_question(question_id):
+    return bool(question_id) and question_id[0] in TYPE_INDEX
+
+
+def response_matrix(response_sets):
+    # One column per RIASEC question id, in first-seen order; NaN = unanswered
+    question_ids = {}
+    for responses in response_sets:
+        for question_id in responses:
+            if question_id not in question_ids and is_riasec_question(question_id):
+                question_ids[question_id] = len(question_ids)
+
+    matrix = np.full((len(response_sets), len(question_ids)), np.nan)
+    for row, responses in enumerate(response_sets):
+        for question_id, rating in responses.items():
+            column = question_ids.get(question_id)
+            if column is not None and isinstance(rating, (int, float)):
+                matrix[row, column] = rating
+
+    return matrix, list(question_ids)
+
+
+def score_matrix(matrix, question_ids):
+    # Question -> type membership turns the per-type sums into one matmul
+    membership = np.zeros((len(question_ids), len(RIASEC_TYPES)))
+    membership[np.arange(len(question_ids)), [TYPE_INDEX[q[0]] for q in question_ids]] = 1.0
+
+    answered = ~np.isnan(matrix)
+    sums = np.where(answered, matrix, 0.0) @ membership
+    counts = answered.astype(float) @ membership
+
+    with np.errstate(divide='ignore', invalid='ignore'):
+        scores = np.where(counts > 0, sums / (counts * MAX_RATING) * 100, 0.0)
+    return scores
+
+
+def holland_codes(scores):
+    # Stable sort keeps R-I-A-S-E-C order on ties, same as sorted() per student
+    top = np.argsort(-scores, axis=1, kind='stable')[:, :3]
+    letters = np.array(RIASEC_TYPES)[top]
+    return [''.join(row) for row in letters]
+
+
+def score_dicts(scores):
+    return [dict(zip(RIASEC_TYPES, row)) for row in scores.tolist()]
+
+
+def _parse_value(value):
+    value = value.strip()
+    if not value:
+        return None
+    try:
+        number = float(value)
+    except ValueError:
+        return value
+    return int(number) if number.is_integer() else number
+
+
+def read_csv_batch(stream, max_rows):
+    # Columns: session_id, student_name, question ids (R1..C5) and any quiz answers
+    reader = csv.reader(io.TextIOWrapper(stream, encoding='utf-8-sig', newline=''))
+    header = [column.strip() for column in next(reader, [])]
+
+    assessments = []
+    for row in reader:
+        if not any(cell.strip() for cell in row):
+            continue
+        if len(assessments) >= max_rows:
+            raise ValueError(f"Batch is limited to {max_rows} assessments")
+
+        values = dict(zip(header, row))
+        responses = {}
+        for column, value in values.items():
+            if column in ('session_id', 'student_name'):
+                continue
+            parsed = _parse_value(value)
+            if parsed is not None:
+                responses[column] = parsed
+
+        assessments.append({
+            "session_id": values.get('session_id', '').strip() or None,
+            "student_name": values.get('student_name', '').strip() or 'Anonymous',
+            "responses": responses
+        })
+
+    return assessments
+
+
+def score_batch(response_sets):
+    matrix, question_ids = response_matrix(response_sets)
+    scores = score_matrix(matrix, question_ids)
+    return score_dicts(scores), holland_codes(scores)
@@ -0,0 +1,235 @@
+#!/usr/bin/env python3
+"""
+In-Process Performance Benchmarks
+Career Guidance System
+
+Times the scoring and recommendation functions and every /api/colleges
+filter combination against synthetic catalogs, using the Flask test
+client and a temporary database. Results can be saved as a JSON baseline
+and later compared against it to catch regressions before deploying.
+
+    python benchmark_api.py --save benchmarks/baseline.json
+    python benchmark_api.py --compare benchmarks/baseline.json --threshold 0.2
+"""
+
+import argparse
+import itertools
+import json
+import os
+import platform
+import random
+import shutil
+import sqlite3
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+from datetime import datetime
+
+DEFAULT_SIZES = (155, 10000, 1000000)
+QUICK_SIZES = (155, 10000)
+MIN_TIME = 0.5          # seconds spent per benchmark
+MAX_ITERATIONS = 2000
+WARMUP = 3
+
+SEED_CSV = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'data', 'jk_colleges_clean.csv')
+
+COLLEGE_FILTERS = {
+    'course_type': 'MBBS',
+    'region': 'Jammu',
+    'max_fee': 50000
+}
+
+
+def build_synthetic_database(db_path, size, seed=42):
+    # Imported here so the parent process never loads the API modules
+    from fix_database import COLLEGE_SCHEMA, INSERT_COLLEGE_SQL, read_college_rows, content_hash
+    from migrations import migrate
+
+    seed_rows = [row[:-1] for row in read_college_rows(SEED_CSV, [])]
+    rng = random.Random(seed)
+
+    conn = sqlite3.connect(db_path)
+    migrate(conn)
+    conn.execute("PRAGMA synchronous = OFF")
+    fee_column = [column for column, _ in COLLEGE_SCHEMA].index('avg_fee_annual')
+
+    with conn:
+        batch = []
+        for i in range(size):
+            row = list(seed_rows[i % len(seed_rows)])
+            if i >= len(seed_rows):
+                row[0] = f'SYN{i:07d}'
+                row[1] = f'{row[1]} #{i}'
+                row[fee_column] = round(row[fee_column] * rng.uniform(0.5, 1.5), 2)
+            row.append(content_hash(row))
+            batch.append(row)
+            if len(batch) >= 10000:
+                conn.executemany(INSERT_COLLEGE_SQL, batch)
+                batch = []
+        if batch:
+            conn.executemany(INSERT_COLLEGE_SQL, batch)
+
+    conn.execute("PRAGMA journal_mode = WAL")
+    conn.close()
+
+
+def time_call(func):
+    for _ in range(WARMUP):
+        func()
+
+    samples = []
+    deadline = time.perf_counter() + MIN_TIME
+    while len(samples) < MAX_ITERATIONS and (time.perf_counter() < deadline or len(samples) < 5):
+        start = time.perf_counter_ns()
+        func()
+        samples.append((time.perf_counter_ns() - start) / 1000)
+
+    samples.sort()
+    return {
+        "iterations": len(samples),
+        "median_us": round(statistics.median(samples), 3),
+        "p95_us": round(samples[min(len(samples) - 1, int(len(samples) * 0.95))], 3),
+        "mean_us": round(statistics.fmean(samples), 3),
+        "min_us": round(samples[0], 3)
+    }
+
+
+def run_worker(size):
+    # Runs in a child process with CAREER_DB_PATH pointing at the synthetic DB
+    import complete_api
+    from complete_api import (app, response_cache, calculate_riasec_scores, generate_holland_code,
+                              get_course_recommendations, get_college_recommendations)
+
+    client = app.test_client()
+    rng = random.Random(7)
+    questions = json.loads(client.get('/api/assessment/questions').data)['riasec_questions']
+    responses = {q['id']: rng.randint(1, 5) for q in questions}
+    scores = calculate_riasec_scores(responses)
+    courses = get_course_recommendations(scores, responses)
+
+    results = {
+        "calculate_riasec_scores": time_call(lambda: calculate_riasec_scores(responses)),
+        "generate_holland_code": time_call(lambda: generate_holland_code(scores)),
+        "get_course_recommendations": time_call(lambda: get_course_recommendations(scores, responses)),
+        "get_college_recommendations": time_call(lambda: get_college_recommendations(courses)),
+    }
+
+    def submit():
+        client.post('/api/assessment/submit', json={'session_id': 'bench', 'responses': responses})
+
+    results["POST /api/assessment/submit"] = time_call(submit)
+
+    names = list(COLLEGE_FILTERS)
+    for count in range(len(names) + 1):
+        for combo in itertools.combinations(names, count):
+            params = {name: COLLEGE_FILTERS[name] for name in combo}
+            label = f"GET /api/colleges [{', '.join(combo) or 'no filter'}]"
+
+            def uncached(params=params):
+                response_cache.cache.clear()
+                client.get('/api/colleges', query_string=params)
+
+            results[label] = time_call(uncached)
+            results[label + " cached"] = time_call(lambda params=params: client.get('/api/colleges', query_string=params))
+
+    complete_api.assessment_writer.flush()
+    return results
+
+
+def run_size(size, keep_dir=None):
+    work_dir = keep_dir or tempfile.mkdtemp(prefix='career_bench_')
+    db_path = os.path.join(work_dir, f'bench_{size}.db')
+    try:
+        print(f"🏗️ Building synthetic catalog with {size:,} colleges...", file=sys.stderr)
+        start = time.perf_counter()
+        build_synthetic_database(db_path, size)
+        print(f"   built in {time.perf_counter() - start:.1f}s", file=sys.stderr)
+
+        env = dict(os.environ, CAREER_DB_PATH=db_path)
+        output = subprocess.run(
+            [sys.executable, os.path.abspath(__file__), '--worker', str(size)],
+            env=env, capture_output=True, text=True, check=True,
+            cwd=os.path.dirname(os.path.abspath(__file__))
+        ).stdout
+        return json.loads(output.strip().splitlines()[-1])
+    finally:
+        if keep_dir is None:
+            shutil.rmtree(work_dir, ignore_errors=True)
+
+
+def compare(current, baseline, threshold):
+    regressions = []
+    for size, benchmarks in current['results'].items():
+        for name, result in benchmarks.items():
+            previous = baseline.get('results', {}).get(size, {}).get(name)
+            if not previous or not previous.get('median_us'):
+                continue
+            ratio = result['median_us'] / previous['median_us']
+            marker = '❌' if ratio > 1 + threshold else '✅'
+            print(f"{marker} [{size}] {name}: {previous['median_us']:.1f}us -> {result['median_us']:.1f}us ({ratio:.2f}x)")
+            if ratio > 1 + threshold:
+                regressions.append((size, name, ratio))
+    return regressions
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark scoring, recommendations and catalog queries")
+    parser.add_argument('--sizes', help="Comma-separated catalog sizes (default: 155,10000,1000000)")
+    parser.add_argument('--quick', action='store_true', help="Only run the 155 and 10k catalogs")
+    parser.add_argument('--save', help="Write results to this JSON baseline file")
+    parser.add_argument('--compare', help="Compare results against this JSON baseline file")
+    parser.add_argument('--threshold', type=float, default=0.2,
+                        help="Allowed slowdown of the median before flagging a regression (0.2 = 20%%)")
+    parser.add_argument('--worker', type=int, help=argparse.SUPPRESS)
+    args = parser.parse_args()
+
+    if args.worker is not None:
+        print(json.dumps(run_worker(args.worker)))
+        return
+
+    if args.sizes:
+        sizes = [int(size) for size in args.sizes.split(',')]
+    else:
+        sizes = QUICK_SIZES if args.quick else DEFAULT_SIZES
+
+    print("⏱️ CAREER GUIDANCE BENCHMARKS")
+    print("=" * 50)
+
+    report = {
+        "meta": {
+            "created_at": datetime.now().isoformat(),
+            "python": platform.python_version(),
+            "platform": platform.platform(),
+            "sizes": sizes
+        },
+        "results": {}
+    }
+
+    for size in sizes:
+        results = run_size(size)
+        report['results'][str(size)] = results
+        print(f"\n📊 {size:,} colleges")
+        for name, result in results.items():
+            print(f"   {name:<55} median {result['median_us']:>10.1f}us   p95 {result['p95_us']:>10.1f}us")
+
+    if args.save:
+        os.makedirs(os.path.dirname(os.path.abspath(args.save)), exist_ok=True)
+        with open(args.save, 'w') as f:
+            json.dump(report, f, indent=2)
+        print(f"\n💾 Baseline saved to {args.save}")
+
+    if args.compare:
+        with open(args.compare) as f:
+            baseline = json.load(f)
+        print(f"\n🔍 Comparing with {args.compare} (threshold {args.threshold:.0%})")
+        regressions = compare(report, baseline, args.threshold)
+        if regressions:
+            print(f"\n❌ {len(regressions)} benchmarks regressed beyond {args.threshold:.0%}")
+            sys.exit(1)
+        print("\n✅ No regressions beyond the threshold")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,398 @@
+#!/usr/bin/env python3
+"""
+In-Memory College Catalog
+Career Guidance System
+"""
+
+import hashlib
+import os
+import sqlite3
+import threading
+import time
+from bisect import bisect_left, bisect_right
+from datetime import datetime
+
+from db import DB_PATH, PRAGMAS
+from geo import GridIndex, city_coordinates, haversine_km, MAX_DISTANCE_KM
+from metrics import metrics
+
+CHECK_INTERVAL = float(os.environ.get('CAREER_CATALOG_CHECK_INTERVAL', '1.0'))
+
+LOAD_COLLEGES_SQL = 'SELECT * FROM colleges ORDER BY id'
+CATALOG_REVISION_SQL = 'SELECT revision FROM catalog_revision WHERE id = 1'
+
+# Columns with an equality index: query parameter -> column name
+INDEXED_COLUMNS = ('course_type', 'region', 'category', 'is_government')
+
+# Colleges kept per course type for recommendations
+TOP_COLLEGES_PER_COURSE = 3
+
+# With a student location, colleges are ranked in distance bands of this
+# width (nearest band first, then government first and cheapest within a
+# band); 0 turns the distance term off
+DISTANCE_BAND_KM = float(os.environ.get('CAREER_DISTANCE_BAND_KM', '50'))
+
+
+def recommendation_rank(college):
+    # Government first, then cheapest
+    return (0 if college['is_government'] == 1 else 1, college['avg_fee_annual'], college['id'])
+
+
+def calculate_admission_probability(college):
+    # Simple probability based on college type and difficulty
+    base_prob = 0.7
+    if college.get('is_government') == 1:
+        base_prob *= 0.8  # Government colleges are more competitive
+    if college.get('admission_difficulty', 1) > 3:
+        base_prob *= 0.6  # High difficulty reduces probability
+    return min(0.95, max(0.3, base_prob))
+
+
+def build_college_recommendation(college):
+    return {
+        "college_id": college['id'],
+        "college_name": college['college_name'],
+        "course_type": college['course_type'],
+        "location": f"{college['city']}, {college['region']}",
+        "annual_fee": college['avg_fee_annual'],
+        "college_type": college['category'],
+        "admission_mode": college['admission_mode'] or 'Merit-based',
+        "admission_probability": calculate_admission_probability(college),
+        "reason": f"Top choice for {college['course_type']}"
+    }
+
+
+def recommendation_key(recommendation):
+    # Identifies the college behind a recommendation entry stored before
+    # entries carried their college_id. Not unique: the catalog has distinct
+    # colleges with the same name, course, location and fee.
+    return tuple(recommendation.get(field) for field in ('college_name', 'course_type', 'location', 'annual_fee'))
+
+
+class CatalogSnapshot:
+    def __init__(self, colleges, loaded_at=None, modified_at=None):
+        self.colleges = colleges
+        self.loaded_at = loaded_at
+        self.modified_at = modified_at
+        self.by_id = {college['id']: college for college in colleges}
+
+        # Secondary indexes hold row positions in id order
+        self.indexes = {column: {} for column in INDEXED_COLUMNS}
+        for position, college in enumerate(colleges):
+            for column in INDEXED_COLUMNS:
+                self.indexes[column].setdefault(college[column], []).append(position)
+
+        # Fee index: positions sorted by (avg_fee_annual, id)
+        self.fee_order = sorted(range(len(colleges)), key=lambda p: (colleges[p]['avg_fee_annual'], colleges[p]['id']))
+        self.fees = [colleges[p]['avg_fee_annual'] for p in self.fee_order]
+        self.fee_keys = [(colleges[p]['avg_fee_annual'], colleges[p]['id']) for p in self.fee_order]
+        self.ids = [college['id'] for college in colleges]
+
+        # Recommendation entries per course type: government first, then cheapest
+        self.top_by_course = {}
+        self.top_rows_by_course = {}
+        for course_type, positions in self.indexes['course_type'].items():
+            ranked = sorted((colleges[p] for p in positions), key=recommendation_rank)
+            self.top_rows_by_course[course_type] = ranked[:TOP_COLLEGES_PER_COURSE]
+            self.top_by_course[course_type] = [
+                build_college_recommendation(college) for college in ranked[:TOP_COLLEGES_PER_COURSE]
+            ]
+
+        # Coordinates joined from data/city_coordinates.csv (None when the
+        # city is not listed) and spatial indexes over the located positions
+        self.locations = [city_coordinates.locate(college['city'], college['region']) for college in colleges]
+        located = [(location[0], location[1], p) for p, location in enumerate(self.locations) if location]
+        self.geo = GridIndex(located)
+        self.geo_by_course = {
+            course_type: GridIndex(item for item in located if colleges[item[2]]['course_type'] == course_type)
+            for course_type in self.indexes['course_type']
+        }
+
+        digest = hashlib.sha1()
+        for college in colleges:
+            digest.update(repr(sorted(college.items())).encode('utf-8'))
+        self.version = digest.hexdigest()[:16]
+
+    def __len__(self):
+        return len(self.colleges)
+
+    def top_colleges(self, course_types):
+        recommendations = []
+        for course_type in course_types:
+            recommendations.extend(dict(entry) for entry in self.top_by_course.get(course_type, ()))
+        return recommendations
+
+    def top_candidates(self, course_types, near=None):
+        # Recommendation entries plus the college rows they were built from;
+        # near is the student's (lat, lon), if known
+        if near is None or DISTANCE_BAND_KM <= 0:
+            recommendations = self.top_colleges(course_types)
+            rows = [row for course_type in course_types for row in self.top_rows_by_course.get(course_type, ())]
+            return recommendations, rows
+
+        recommendations = []
+        rows = []
+        for course_type in course_types:
+            for college in self.nearest_ranked(course_type, near[0], near[1]):
+                recommendations.append(dict(
+                    build_college_recommendation(college),
+                    distance_km=self.distance_km(college, near)
+                ))
+                rows.append(college)
+        return recommendations, rows
+
+    def nearest_ranked(self, course_type, lat, lon, count=TOP_COLLEGES_PER_COURSE):
+        index = self.geo_by_course.get(course_type)
+        if not index:
+            return self.top_rows_by_course.get(course_type, [])[:count]
+
+        # Grow the radius until it holds count colleges; the one extra band
+        # brings in every college sharing a band with the last of them, so
+        # the ranking is exact
+        radius = DISTANCE_BAND_KM
+        while len(index.within(lat, lon, radius)) < count and radius < MAX_DISTANCE_KM:
+            radius = min(radius * 2, MAX_DISTANCE_KM)
+        found = index.within(lat, lon, radius + DISTANCE_BAND_KM)
+        ranked = sorted(
+            found,
+            key=lambda item: (int(item[0] // DISTANCE_BAND_KM), recommendation_rank(self.colleges[item[1]]))
+        )
+        chosen = [self.colleges[p] for _, p in ranked[:count]]
+
+        # Colleges whose city has no coordinates only fill the remaining slots
+        chosen_ids = {college['id'] for college in chosen}
+        for college in self.top_rows_by_course.get(course_type, ()):
+            if len(chosen) >= count:
+                break
+            if college['id'] not in chosen_ids:
+                chosen.append(college)
+        return chosen
+
+    def distance_km(self, college, near):
+        location = self.locations[bisect_left(self.ids, college['id'])]
+        if location is None:
+            return None
+        return round(haversine_km(near[0], near[1], location[0], location[1]), 1)
+
+    def nearby(self, lat, lon, radius_km=None, k=None, course_type=None):
+        # [(distance_km, college)] nearest first: every college within
+        # radius_km (at most k of them when k is given), or the k nearest
+        index = self.geo_by_course.get(course_type) if course_type is not None else self.geo
+        if not index:
+            return []
+        if radius_km is not None:
+            found = index.within(lat, lon, radius_km)
+            if k is not None:
+                found = found[:k]
+        else:
+            found = index.nearest(lat, lon, k)
+        return [(distance, self.colleges[p]) for distance, p in found]
+
+    def select(self, course_type=None, region=None, category=None, is_government=None, max_fee=None,
+               sort='id', after=None):
+        equality = {
+            'course_type': course_type,
+            'region': region,
+            'category': category,
+            'is_government': is_government
+        }
+        equality = {column: value for column, value in equality.items() if value is not None}
+        colleges = self.colleges
+
+        # Drive the lookup from the most selective index, check the rest per row
+        driver = min((self.indexes[column].get(value, []) for column, value in equality.items()),
+                     key=len, default=None)
+
+        if sort == 'fee':
+            start = bisect_right(self.fee_keys, tuple(after)) if after else 0
+            stop = bisect_right(self.fees, max_fee) if max_fee is not None else len(self.fee_order)
+            if driver is not None and len(driver) < stop - start:
+                positions = sorted(
+                    (p for p in driver if self.fee_key(p) > tuple(after)) if after else driver,
+                    key=self.fee_key
+                )
+            else:
+                positions = (self.fee_order[i] for i in range(start, stop))
+        else:
+            start = bisect_right(self.ids, after[0]) if after else 0
+            if driver is None and max_fee is not None and bisect_right(self.fees, max_fee) < len(colleges) - start:
+                driver = sorted(self.fee_order[:bisect_right(self.fees, max_fee)])
+            if driver is not None:
+                positions = (driver[i] for i in range(bisect_left(driver, start), len(driver)))
+            else:
+                positions = range(start, len(colleges))
+
+        for position in positions:
+            college = colleges[position]
+            if any(college[column] != value for column, value in equality.items()):
+                continue
+            if max_fee is not None and college['avg_fee_annual'] > max_fee:
+                continue
+            yield college
+
+    def fee_key(self, position):
+        college = self.colleges[position]
+        return (college['avg_fee_annual'], college['id'])
+
+
+def keyset_key(college, sort='id'):
+    if sort == 'fee':
+        return [college['avg_fee_annual'], college['id']]
+    return [college['id']]
+
+
+def build_keyset_query(course_type=None, region=None, category=None, is_government=None, max_fee=None,
+                       sort='id', after=None, limit=50):
+    query = "SELECT * FROM colleges WHERE 1=1"
+    params = []
+
+    for column, value in (('course_type', course_type), ('region', region),
+                          ('category', category), ('is_government', is_government)):
+        if value is not None:
+            query += f" AND {column} = ?"
+            params.append(value)
+
+    if max_fee is not None:
+        query += " AND avg_fee_annual <= ?"
+        params.append(max_fee)
+
+    if sort == 'fee':
+        if after:
+            query += " AND (avg_fee_annual, id) > (?, ?)"
+            params.extend(after)
+        query += " ORDER BY avg_fee_annual, id"
+    else:
+        # Always a rowid range, so the first page is a SEARCH rather than a SCAN
+        query += " AND id > ?"
+        params.append(after[0] if after else 0)
+        query += " ORDER BY id"
+
+    if limit is not None:
+        query += " LIMIT ?"
+        params.append(limit)
+
+    return query, params
+
+
+def catalog_key(stamp):
+    # The trigger-maintained revision changes only with the colleges table;
+    # without it, any write to the file counts as a catalog change
+    inode, db_mtime, wal_mtime, data_version, revision = stamp
+    if revision is not None:
+        return (inode, revision)
+    return (inode, db_mtime, wal_mtime, data_version)
+
+
+class CollegeCatalog:
+    def __init__(self, db_path=DB_PATH, check_interval=CHECK_INTERVAL):
+        self.db_path = db_path
+        self.check_interval = check_interval
+        self.reloads = 0
+        self._snapshot = CatalogSnapshot([])
+        self._lock = threading.Lock()
+        self._conn = None
+        self._conn_inode = None
+        self._stamp = None
+        self._next_check = 0.0
+
+    @property
+    def ready(self):
+        return self._stamp is not None
+
+    @property
+    def current(self):
+        # The loaded snapshot without a change check, for callers that must not
+        # block (the ASGI app refreshes from a background task instead)
+        return self._snapshot
+
+    def snapshot(self):
+        if time.monotonic() >= self._next_check:
+            self.refresh()
+        return self._snapshot
+
+    def refresh(self, force=False):
+        # Only one thread checks for changes; others keep serving the current snapshot
+        if not self._lock.acquire(blocking=force or not self.ready):
+            return False
+        try:
+            self._next_check = time.monotonic() + self.check_interval
+            stamp = self._change_stamp()
+            if stamp is None:
+                return False
+            if not force and self._stamp is not None and catalog_key(stamp) == catalog_key(self._stamp):
+                # Only other tables (e.g. assessments) changed; keep the snapshot
+                self._stamp = stamp
+                return False
+
+            with metrics.timer('career_sqlite_query_duration_seconds', statement='catalog_load'):
+                cursor = self._conn.execute(LOAD_COLLEGES_SQL)
+                columns = [desc[0] for desc in cursor.description]
+                colleges = [dict(zip(columns, row)) for row in cursor]
+
+            # Swap in the fully built snapshot in one reference assignment
+            modified_at = max(m for m in stamp[1:3] if m is not None) / 1e9
+            self._snapshot = CatalogSnapshot(colleges, loaded_at=datetime.now().isoformat(), modified_at=modified_at)
+            self._stamp = stamp
+            self.reloads += 1
+            return True
+        finally:
+            self._lock.release()
+
+    def _change_stamp(self):
+        try:
+            db_stat = os.stat(self.db_path)
+        except FileNotFoundError:
+            return None
+
+        try:
+            wal_mtime = os.stat(self.db_path + '-wal').st_mtime_ns
+        except FileNotFoundError:
+            wal_mtime = None
+
+        # fix_database.py replaces the file, so reconnect when the inode changes
+        reconnected = False
+        if self._conn is None or self._conn_inode != db_stat.st_ino:
+            if self._conn is not None:
+                self._conn.close()
+            self._conn = sqlite3.connect(self.db_path, check_same_thread=False)
+            for pragma in PRAGMAS:
+                self._conn.execute(pragma)
+            self._conn_inode = db_stat.st_ino
+            reconnected = True
+
+        data_version = self._conn.execute('PRAGMA data_version').fetchone()[0]
+        try:
+            revision = self._conn.execute(CATALOG_REVISION_SQL).fetchone()[0]
+        except sqlite3.OperationalError:
+            revision = None  # schema older than migration 5
+        stamp = (db_stat.st_ino, db_stat.st_mtime_ns, wal_mtime, data_version, revision)
+
+        # data_version is only comparable on one connection; after reopening the
+        # same unchanged file, rebase it instead of reloading an identical catalog
+        if reconnected and self._stamp is not None and self._stamp[:3] == stamp[:3] and revision is None:
+            self._stamp = stamp
+        return stamp
+
+    def close(self):
+        # Drop the change-check connection but keep serving the loaded snapshot;
+        # it is reopened on the next check (e.g. in a freshly forked worker)
+        with self._lock:
+            if self._conn is not None:
+                self._conn.close()
+            self._conn = None
+            self._conn_inode = None
+
+    def stats(self):
+        snapshot = self._snapshot
+        return {
+            "ready": self.ready,
+            "colleges": len(snapshot),
+            "located": len(snapshot.geo),
+            "version": snapshot.version,
+            "data_version": self._stamp[3] if self._stamp else None,
+            "loaded_at": snapshot.loaded_at,
+            "reloads": self.reloads
+        }
+
+
+catalog = CollegeCatalog()
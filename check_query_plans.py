@@ -0,0 +1,116 @@
+#!/usr/bin/env python3
+"""
+Query Plan Regression Check
+Career Guidance System
+
+Runs EXPLAIN QUERY PLAN on every SQL statement the API issues and fails if
+any of them falls back to a full table SCAN.
+"""
+
+import argparse
+import itertools
+import os
+import re
+import sqlite3
+import sys
+
+from analytics import HOLLAND_REPORT_SQL, COURSE_REPORT_SQL, REGION_REPORT_SQL, STORED_ROLLUP_SQL
+from assessment_archive import EXPIRED_ASSESSMENTS_SQL
+from assessment_export import export_query
+from assessment_store import SELECT_ASSESSMENT_SQL
+from catalog import LOAD_COLLEGES_SQL, build_keyset_query
+from college_search import fts_query, build_search_query
+from fix_database import CSV_FILE, load_colleges_csv
+from migrations import migrate
+
+# A bare "SCAN table" reads every row; index and covering-index scans are fine
+FULL_SCAN = re.compile(r'^SCAN (\w+)$')
+
+SAMPLE_FILTERS = {
+    'course_type': 'MBBS',
+    'region': 'Jammu',
+    'category': 'Government',
+    'is_government': 1,
+    'max_fee': 50000
+}
+
+
+def api_queries():
+    # (name, sql, params, full scan allowed)
+    queries = [
+        ("catalog load", LOAD_COLLEGES_SQL, [], True),
+        ("assessment by session", SELECT_ASSESSMENT_SQL, ['s'], False),
+        ("assessments by date range",
+         "SELECT * FROM assessments WHERE created_at >= ? AND created_at < ? ORDER BY created_at",
+         ['2024-01-01', '2024-02-01'], False),
+        ("assessments past retention", EXPIRED_ASSESSMENTS_SQL, ['2024-01-01', 1000], False),
+        ("analytics replaced assessment", STORED_ROLLUP_SQL, ['s'], False),
+        ("analytics holland codes", HOLLAND_REPORT_SQL, ['2024-01-01', '2024-01-31'], False),
+        ("analytics courses", COURSE_REPORT_SQL, ['2024-01-01', '2024-01-31'], False),
+        ("analytics regions", REGION_REPORT_SQL, ['2024-01-01', '2024-01-31'], False),
+    ]
+
+    for start, end in ((None, None), ('2024-01-01', None), ('2024-01-01', '2024-01-31')):
+        sql, params = export_query(start, end)
+        queries.append((f"assessment export [{start or 'all'} - {end or 'latest'}]", sql, params, start is None))
+
+    for mode in ('search', 'autocomplete'):
+        for filters in ({}, {'course_type': 'MBBS', 'region': 'Kashmir', 'max_fee': 50000}):
+            sql, params = build_search_query(fts_query('Govt Medical Srin', mode), mode, limit=10, **filters)
+            label = f"college {mode} [{', '.join(filters) or 'no filter'}]"
+            queries.append((label, sql, params, False))
+
+    # Every filter combination /api/colleges can stream, for both sort orders,
+    # on the first page and on a cursor page
+    names = list(SAMPLE_FILTERS)
+    for size in range(len(names) + 1):
+        for combo in itertools.combinations(names, size):
+            filters = {name: SAMPLE_FILTERS[name] for name in combo}
+            for sort, after in (('id', None), ('id', [10]), ('fee', None), ('fee', [5000, 10])):
+                sql, params = build_keyset_query(sort=sort, after=after, limit=50, **filters)
+                label = f"colleges [{', '.join(combo) or 'no filter'}] sort={sort}{' +cursor' if after else ''}"
+                queries.append((label, sql, params, False))
+
+    return queries
+
+
+def scratch_database():
+    conn = sqlite3.connect(':memory:')
+    migrate(conn)
+    if os.path.exists(CSV_FILE):
+        load_colleges_csv(conn, CSV_FILE)
+        conn.execute("ANALYZE")
+    return conn
+
+
+def check_plans(conn, verbose=False):
+    failures = []
+    for name, sql, params, full_scan_ok in api_queries():
+        plan = [row[3] for row in conn.execute(f"EXPLAIN QUERY PLAN {sql}", params)]
+        scans = [step for step in plan if FULL_SCAN.match(step)]
+        if scans and not full_scan_ok:
+            failures.append((name, plan))
+            print(f"❌ {name}: {' | '.join(plan)}")
+        elif verbose:
+            print(f"✅ {name}: {' | '.join(plan)}")
+    return failures
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Fail if any API query plan regresses to a full table scan")
+    parser.add_argument('--db', help="Check an existing database instead of a scratch copy built from migrations")
+    parser.add_argument('--verbose', action='store_true', help="Print every plan, not just failures")
+    args = parser.parse_args()
+
+    print("🔍 CHECKING API QUERY PLANS")
+    print("=" * 40)
+
+    conn = sqlite3.connect(args.db) if args.db else scratch_database()
+    failures = check_plans(conn, args.verbose)
+    conn.close()
+
+    total = len(api_queries())
+    if failures:
+        print(f"\n❌ {len(failures)} of {total} queries use a full table scan")
+        sys.exit(1)
+    print(f"\n✅ All {total} queries use an index or rowid search")
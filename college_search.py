@@ -0,0 +1,82 @@
+#!/usr/bin/env python3
+"""
+Full-Text College Search
+Career Guidance System
+"""
+
+import re
+
+# BM25 column weights: college_name, courses_offered, city, address
+BM25_WEIGHTS = (10.0, 3.0, 4.0, 1.0)
+
+SEARCH_COLUMNS = ('id', 'college_id', 'college_name', 'course_type', 'category', 'region', 'city',
+                  'avg_fee_annual', 'admission_mode', 'is_government', 'courses_offered', 'address')
+AUTOCOMPLETE_COLUMNS = ('id', 'college_id', 'college_name', 'course_type', 'city', 'region')
+
+TOKEN = re.compile(r'\w+', re.UNICODE)
+
+# Abbreviations students commonly type for words used in college names
+ABBREVIATIONS = {
+    'govt': 'government',
+    'gov': 'government',
+    'univ': 'university',
+    'uni': 'university',
+    'engg': 'engineering',
+    'coll': 'college',
+    'inst': 'institute',
+    'tech': 'technology',
+    'mgmt': 'management',
+    'natl': 'national',
+}
+
+
+def _term(token, prefix):
+    star = '*' if prefix else ''
+    expansion = ABBREVIATIONS.get(token)
+    if expansion:
+        return f'("{token}"{star} OR "{expansion}"{star})'
+    return f'"{token}"{star}'
+
+
+def fts_query(text, mode='search'):
+    # User text is never passed to MATCH as-is: every token is quoted, so FTS5
+    # operators and punctuation in the input cannot break the query.
+    tokens = TOKEN.findall(text.lower())
+    if not tokens:
+        return None
+
+    if mode == 'autocomplete':
+        # Every word must match, the last one (still being typed) as a prefix
+        terms = [_term(token, False) for token in tokens[:-1]] + [_term(tokens[-1], True)]
+        return ' AND '.join(terms)
+
+    # Ranked search: any word may match, each as a prefix; BM25 orders the hits
+    return ' OR '.join(_term(token, True) for token in tokens)
+
+
+def build_search_query(match, mode='search', course_type=None, region=None, max_fee=None, limit=10):
+    columns = AUTOCOMPLETE_COLUMNS if mode == 'autocomplete' else SEARCH_COLUMNS
+    weights = ', '.join(str(w) for w in BM25_WEIGHTS)
+
+    query = f'''
+        SELECT {', '.join('c.' + column for column in columns)}, bm25(colleges_fts, {weights}) AS rank
+        FROM colleges_fts
+        JOIN colleges c ON c.id = colleges_fts.rowid
+        WHERE colleges_fts MATCH ?'''
+    params = [match]
+
+    if course_type:
+        query += " AND c.course_type = ?"
+        params.append(course_type)
+
+    if region:
+        query += " AND c.region = ?"
+        params.append(region)
+
+    if max_fee:
+        query += " AND c.avg_fee_annual <= ?"
+        params.append(max_fee)
+
+    query += " ORDER BY rank LIMIT ?"
+    params.append(limit)
+    return query, params
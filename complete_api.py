@@ -1,14 +1,116 @@
-from flask import Flask, request, jsonify
+from flask import Flask, Response, g, request, jsonify
 from flask_cors import CORS
-import sqlite3
+import base64
 import json
+import math
 import os
+import time
 from datetime import datetime
 import uuid
+from itertools import islice
+
+from db import pool, DB_PATH
+from metrics import metrics, CONTENT_TYPE as METRICS_CONTENT_TYPE
+from catalog import catalog, build_college_recommendation, build_keyset_query, keyset_key, DISTANCE_BAND_KM
+from migrations import migrate_database
+from college_search import fts_query, build_search_query
+from response_cache import CatalogResponseCache, RecommendationCache, conditional_response, CACHE_MAX_AGE
+from question_bank import question_bank
+from batch_scoring import read_csv_batch, score_batch, is_riasec_question
+from assessment_writer import AssessmentWriter
+from admission_model import admission_model
+from course_scoring import course_matrix
+from assessment_store import INSERT_ASSESSMENT_SQL, SELECT_ASSESSMENT_SQL, pack_assessment, unpack_assessment
+from analytics import record_assessments, date_range, holland_code_report, course_report, region_report
+from assessment_export import EXPORT_FORMATS, check_export, export_stream, export_filename
+from similar_students import profile_index, top_course, MAX_NEIGHBOURS
+from geo import city_coordinates, valid_coordinates
 
 app = Flask(__name__)
 CORS(app)
 
+response_cache = CatalogResponseCache()
+recommendation_cache = RecommendationCache()
+
+# Each committed batch also updates the daily analytics rollups
+assessment_writer = AssessmentWriter(INSERT_ASSESSMENT_SQL, on_commit=record_assessments)
+
+# Largest JSON page for /api/colleges; NDJSON streams are not capped
+MAX_PAGE_SIZE = 1000
+NDJSON_FETCH_SIZE = 256
+AUTOCOMPLETE_LIMIT = 8
+NEARBY_LIMIT = 10
+
+# Largest number of students accepted by /api/assessment/submit_batch
+MAX_BATCH_SIZE = int(os.environ.get('CAREER_MAX_BATCH_SIZE', '10000'))
+
+# Upgrade existing databases in place, then load the college catalog once at
+# startup; it reloads itself when the DB changes
+try:
+    if os.path.exists(DB_PATH):
+        migrate_database(DB_PATH)
+    catalog.refresh(force=True)
+except Exception as e:
+    print(f"College catalog not loaded: {e}")
+
+# Admission model artifact (admission_model.py --train); reloaded when retrained
+admission_model.refresh()
+
+# Nearest-neighbour index over every stored score profile; submits append to it
+try:
+    profile_index.load()
+except Exception as e:
+    print(f"Profile index not loaded: {e}")
+
+@app.before_request
+def start_request_metrics():
+    g.request_start = time.perf_counter()
+    g.in_flight = True
+    metrics.inc('career_http_requests_in_flight')
+
+@app.after_request
+def record_request_metrics(response):
+    route = request.url_rule.rule if request.url_rule else 'unmatched'
+    metrics.inc('career_http_requests_total', route=route, method=request.method, status=response.status_code)
+    metrics.observe('career_http_request_duration_seconds', time.perf_counter() - g.request_start, route=route)
+    return response
+
+@app.teardown_request
+def finish_request_metrics(error=None):
+    if g.pop('in_flight', False):
+        metrics.inc('career_http_requests_in_flight', -1)
+
+@app.route('/metrics')
+def prometheus_metrics():
+    pool_stats = pool.stats()
+    cache_stats = response_cache.stats()
+    recommendation_stats = recommendation_cache.stats()
+    writer_stats = assessment_writer.stats()
+    catalog_stats = catalog.stats()
+
+    gauges = [
+        ('career_response_cache_hits_total', {}, cache_stats['hits']),
+        ('career_response_cache_misses_total', {}, cache_stats['misses']),
+        ('career_response_cache_hit_ratio', {}, cache_stats['hit_ratio']),
+        ('career_response_cache_entries', {}, cache_stats['entries']),
+        ('career_recommendation_cache_hits_total', {}, recommendation_stats['hits']),
+        ('career_recommendation_cache_misses_total', {}, recommendation_stats['misses']),
+        ('career_recommendation_cache_hit_ratio', {}, recommendation_stats['hit_ratio']),
+        ('career_recommendation_cache_entries', {}, recommendation_stats['entries']),
+        ('career_db_pool_connections', {}, pool_stats['connections']),
+        ('career_db_pool_in_use', {}, pool_stats['in_use']),
+        ('career_db_pool_waits_total', {}, pool_stats['waits']),
+        ('career_db_pool_wait_seconds_total', {}, pool_stats['wait_time_ms'] / 1000),
+        ('career_writer_queue_depth', {}, writer_stats['queue_depth']),
+        ('career_writer_rows_written_total', {}, writer_stats['written']),
+        ('career_writer_rows_failed_total', {}, writer_stats['failed']),
+        ('career_writer_batches_total', {}, writer_stats['batches']),
+        ('career_catalog_colleges', {}, catalog_stats['colleges']),
+        ('career_catalog_reloads_total', {}, catalog_stats['reloads']),
+        ('career_profile_index_profiles', {}, len(profile_index)),
+    ]
+    return Response(metrics.render(gauges), content_type=METRICS_CONTENT_TYPE)
+
 @app.route('/')
 def home():
     return jsonify({
@@ -17,28 +119,116 @@ def home():
         "version": "1.0"
     })
 
-@app.route('/api/health')
-def health():
-    db_exists = os.path.exists('career_guidance.db')
+@app.route('/api/health/live')
+def health_live():
+    # Liveness: the process is up and serving; no I/O of any kind
+    return jsonify({"status": "alive"})
 
-    college_count = 0
-    if db_exists:
+@app.route('/api/health/ready')
+def health_ready():
+    # Readiness from stats maintained at catalog load and by the writer;
+    # once the catalog is loaded, probes never touch the database
+    if not catalog.ready:
         try:
-            conn = sqlite3.connect('career_guidance.db')
-            cursor = conn.cursor()
-            cursor.execute('SELECT COUNT(*) FROM colleges')
-            college_count = cursor.fetchone()[0]
-            conn.close()
-        except:
-            college_count = 0
+            catalog.refresh()
+        except Exception as e:
+            print(f"College catalog not loaded: {e}")
+    catalog_stats = catalog.stats()
+    queue_depth = assessment_writer.depth()
+    ready = (catalog_stats['ready'] and catalog_stats['colleges'] > 0
+             and not assessment_writer.saturated())
 
     return jsonify({
+        "status": "ready" if ready else "not_ready",
+        "colleges_loaded": catalog_stats['colleges'],
+        "catalog_version": catalog_stats['version'],
+        "data_version": catalog_stats['data_version'],
+        "last_reload": catalog_stats['loaded_at'],
+        "writer_queue_depth": queue_depth
+    }), 200 if ready else 503
+
+@app.route('/api/health')
+def health():
+    # Full diagnostic view, built from cached stats rather than SQL
+    catalog_stats = catalog.stats()
+    db_exists = catalog_stats['ready']
+    college_count = catalog_stats['colleges']
+
+    # Revalidating pollers get a 304 without building the body
+    etag = f"health-{catalog_stats['version']}-{int(db_exists)}"
+    if request.if_none_match.contains_weak(etag):
+        response = Response(status=304)
+        response.set_etag(etag, weak=True)
+        return response
+
+    response = jsonify({
         "status": "healthy" if db_exists and college_count > 0 else "initializing",
         "system_ready": db_exists and college_count > 0,
         "database_exists": db_exists,
         "colleges_loaded": college_count,
+        "database_pool": pool.stats(),
+        "catalog": catalog_stats,
+        "response_cache": response_cache.stats(),
+        "recommendation_cache": recommendation_cache.stats(),
+        "assessment_writer": assessment_writer.stats(),
+        "admission_model": admission_model.stats(),
+        "profile_index": profile_index.stats(),
         "timestamp": datetime.now().isoformat()
     })
+    # Weak validator: the timestamp and pool counters change on every call
+    response.set_etag(etag, weak=True)
+    response.cache_control.no_cache = True
+    return response
+
+def encode_cursor(sort, key):
+    payload = json.dumps([sort] + key, separators=(',', ':')).encode('utf-8')
+    return base64.urlsafe_b64encode(payload).decode('ascii').rstrip('=')
+
+
+def decode_cursor(cursor, sort):
+    try:
+        payload = base64.urlsafe_b64decode(cursor + '=' * (-len(cursor) % 4))
+        decoded = json.loads(payload)
+    except (ValueError, TypeError):
+        raise ValueError("Invalid cursor")
+    if not isinstance(decoded, list) or not decoded:
+        raise ValueError("Invalid cursor")
+    cursor_sort, *key = decoded
+    if cursor_sort != sort or len(key) != (2 if sort == 'fee' else 1):
+        raise ValueError("Cursor does not match the requested sort order")
+    # The key is compared against catalog values: a fee number, then an id
+    if sort == 'fee' and not is_number(key[0]):
+        raise ValueError("Invalid cursor")
+    if type(key[-1]) is not int:
+        raise ValueError("Invalid cursor")
+    return key
+
+
+def is_number(value):
+    return type(value) in (int, float) and math.isfinite(value)
+
+
+def stream_colleges_ndjson(filters, sort, after, limit):
+    # Rows go out as they come off the SQLite cursor, so memory stays flat
+    query, params = build_keyset_query(sort=sort, after=after, limit=limit, **filters)
+    with pool.connection() as conn:
+        with metrics.timer('career_sqlite_query_duration_seconds', statement='colleges_keyset_stream'):
+            cursor = conn.execute(query, params)
+        columns = [desc[0] for desc in cursor.description]
+        count = 0
+        last = None
+        while True:
+            rows = cursor.fetchmany(NDJSON_FETCH_SIZE)
+            if not rows:
+                break
+            for row in rows:
+                last = dict(zip(columns, row))
+                count += 1
+                yield json.dumps(last, separators=(',', ':')) + '\n'
+
+    next_cursor = encode_cursor(sort, keyset_key(last, sort)) if last is not None and count == limit else None
+    yield json.dumps({"status": "success", "count": count, "next_cursor": next_cursor}) + '\n'
+
 
 @app.route('/api/colleges')
 def get_colleges():
@@ -46,116 +236,299 @@ def get_colleges():
         # Get query parameters
         course_type = request.args.get('course_type')
         region = request.args.get('region') 
+        category = request.args.get('category')
+        is_government = request.args.get('is_government', type=int)
         max_fee = request.args.get('max_fee', type=int)
         limit = request.args.get('limit', default=50, type=int)
+        sort = request.args.get('sort', default='id')
+        cursor = request.args.get('cursor')
 
-        conn = sqlite3.connect('career_guidance.db')
-        cursor = conn.cursor()
+        if sort not in ('id', 'fee'):
+            return jsonify({"status": "error", "message": "sort must be 'id' or 'fee'"}), 400
 
-        query = "SELECT * FROM colleges WHERE 1=1"
-        params = []
+        try:
+            after = decode_cursor(cursor, sort) if cursor else None
+        except ValueError as e:
+            return jsonify({"status": "error", "message": str(e)}), 400
+
+        filters = {
+            "course_type": course_type or None,
+            "region": region or None,
+            "category": category or None,
+            "is_government": is_government,
+            "max_fee": max_fee or None
+        }
 
-        if course_type:
-            query += " AND course_type = ?"
-            params.append(course_type)
+        if request.accept_mimetypes.best == 'application/x-ndjson':
+            return Response(stream_colleges_ndjson(filters, sort, after, max(limit, 1)),
+                            mimetype='application/x-ndjson')
 
-        if region:
-            query += " AND region = ?"
-            params.append(region)
+        # Answered from the in-memory catalog indexes - no SQL per request
+        limit = min(max(limit, 1), MAX_PAGE_SIZE)
+        snapshot = catalog.snapshot()
+        cache_key = tuple(filters.values()) + (limit, sort, cursor)
 
-        if max_fee:
-            query += " AND avg_fee_annual <= ?"
-            params.append(max_fee)
+        entry = response_cache.get(snapshot.version, cache_key)
+        if entry is None:
+            results = list(islice(snapshot.select(sort=sort, after=after, **filters), limit))
+            next_cursor = encode_cursor(sort, keyset_key(results[-1], sort)) if len(results) == limit else None
 
-        query += f" LIMIT {limit}"
+            entry = response_cache.put(snapshot.version, cache_key, jsonify({
+                "status": "success",
+                "count": len(results),
+                "colleges": results,
+                "next_cursor": next_cursor
+            }))
 
-        cursor.execute(query, params)
-        columns = [desc[0] for desc in cursor.description]
-        results = [dict(zip(columns, row)) for row in cursor.fetchall()]
+        body, etag = entry
+        return conditional_response(request, body, etag, snapshot.modified_at)
 
-        conn.close()
+    except Exception as e:
+        return jsonify({
+            "status": "error", 
+            "message": str(e)
+        }), 500
+
+@app.route('/api/colleges/search')
+def search_colleges():
+    try:
+        q = request.args.get('q', '').strip()
+        mode = request.args.get('mode', default='search')
+        course_type = request.args.get('course_type') or None
+        region = request.args.get('region') or None
+        max_fee = request.args.get('max_fee', type=int) or None
+        default_limit = AUTOCOMPLETE_LIMIT if mode == 'autocomplete' else 20
+        limit = min(max(request.args.get('limit', default=default_limit, type=int), 1), MAX_PAGE_SIZE)
+
+        if mode not in ('search', 'autocomplete'):
+            return jsonify({"status": "error", "message": "mode must be 'search' or 'autocomplete'"}), 400
+
+        match = fts_query(q, mode)
+        if match is None:
+            return jsonify({"status": "error", "message": "q must contain at least one word"}), 400
+
+        snapshot = catalog.snapshot()
+        cache_key = ('search', match, mode, course_type, region, max_fee, limit)
+
+        entry = response_cache.get(snapshot.version, cache_key)
+        if entry is None:
+            query, params = build_search_query(match, mode, course_type, region, max_fee, limit)
+            with pool.connection() as conn, \
+                    metrics.timer('career_sqlite_query_duration_seconds', statement=f'college_{mode}'):
+                cursor = conn.execute(query, params)
+                columns = [desc[0] for desc in cursor.description]
+                results = [dict(zip(columns, row)) for row in cursor.fetchall()]
+
+            entry = response_cache.put(snapshot.version, cache_key, jsonify({
+                "status": "success",
+                "query": q,
+                "mode": mode,
+                "count": len(results),
+                "colleges": results
+            }))
+
+        body, etag = entry
+        return conditional_response(request, body, etag, snapshot.modified_at)
 
+    except Exception as e:
         return jsonify({
-            "status": "success",
-            "count": len(results),
-            "colleges": results
-        })
+            "status": "error",
+            "message": str(e)
+        }), 500
+
+def nearby_colleges_body(lat=None, lon=None, city=None, region=None, radius=None, course_type=None,
+                        limit=NEARBY_LIMIT, snapshot=None):
+    # Raises ValueError for a bad request
+    if city and (lat is None or lon is None):
+        location = city_coordinates.locate(city, region)
+        if location is None:
+            raise ValueError(f"Unknown city: {city}")
+        lat, lon = location
+    if not valid_coordinates(lat, lon):
+        raise ValueError("lat and lon (or a known city) are required")
+    if radius is not None and radius <= 0:
+        raise ValueError("radius must be a positive number of km")
+
+    # Grid index lookup over the catalog snapshot: only the cells around the
+    # point are scanned. Without a radius, the nearest limit colleges.
+    if snapshot is None:
+        snapshot = catalog.snapshot()
+    found = snapshot.nearby(lat, lon, radius_km=radius, k=limit, course_type=course_type)
+    return {
+        "status": "success",
+        "latitude": lat,
+        "longitude": lon,
+        "radius_km": radius,
+        "count": len(found),
+        "colleges": [dict(college, distance_km=round(distance, 1)) for distance, college in found]
+    }
+
+@app.route('/api/colleges/nearby')
+def nearby_colleges():
+    try:
+        try:
+            body = nearby_colleges_body(
+                request.args.get('lat', type=float),
+                request.args.get('lon', type=float),
+                request.args.get('city'),
+                request.args.get('region'),
+                request.args.get('radius', type=float),
+                request.args.get('course_type') or None,
+                min(max(request.args.get('limit', default=NEARBY_LIMIT, type=int), 1), MAX_PAGE_SIZE)
+            )
+        except ValueError as e:
+            return jsonify({"status": "error", "message": str(e)}), 400
+        return jsonify(body)
 
     except Exception as e:
         return jsonify({
-            "status": "error", 
+            "status": "error",
             "message": str(e)
         }), 500
 
+def question_bank_response(body, gzip_body):
+    # The payload is precompressed, so only pick the matching encoding
+    if 'gzip' in request.accept_encodings:
+        response = Response(gzip_body, mimetype='application/json')
+        response.headers['Content-Encoding'] = 'gzip'
+    else:
+        response = Response(body, mimetype='application/json')
+    response.vary.add('Accept-Encoding')
+    response.headers['X-Question-Bank-Version'] = question_bank.version
+    return response
+
+@app.route('/api/assessment/questions')
+def get_assessment_questions():
+    if request.if_none_match.contains(question_bank.etag):
+        response = Response(status=304)
+    else:
+        response = question_bank_response(question_bank.questions_body, question_bank.questions_gzip)
+    response.set_etag(question_bank.etag)
+    response.cache_control.public = True
+    response.cache_control.max_age = CACHE_MAX_AGE
+    return response
+
 @app.route('/api/assessment/start', methods=['POST'])
 def start_assessment():
     try:
-        data = request.get_json() or {}
+        data = request.get_json(silent=True) or {}
         session_id = data.get('session_id') or f"session_{datetime.now().strftime('%Y%m%d_%H%M%S')}_{str(uuid.uuid4())[:8]}"
 
-        # RIASEC Questions
-        riasec_questions = [
-            {"id": "R1", "type": "R", "question": "I enjoy working with tools and machines"},
-            {"id": "I1", "type": "I", "question": "I like to analyze data and solve complex problems"},
-            {"id": "A1", "type": "A", "question": "I enjoy creative activities like art or writing"},
-            {"id": "S1", "type": "S", "question": "I like helping others solve their problems"},
-            {"id": "E1", "type": "E", "question": "I enjoy leading and managing others"},
-            {"id": "C1", "type": "C", "question": "I like organizing data and keeping detailed records"},
-            {"id": "R2", "type": "R", "question": "I prefer hands-on, practical work"},
-            {"id": "I2", "type": "I", "question": "I enjoy scientific experiments and research"},
-            {"id": "A2", "type": "A", "question": "I like to express myself creatively"},
-            {"id": "S2", "type": "S", "question": "I enjoy teaching and training people"},
-            {"id": "E2", "type": "E", "question": "I like to persuade and influence others"},
-            {"id": "C2", "type": "C", "question": "I prefer structured, well-defined tasks"},
-            {"id": "R3", "type": "R", "question": "I like working outdoors"},
-            {"id": "I3", "type": "I", "question": "I enjoy reading scientific journals"},
-            {"id": "A3", "type": "A", "question": "I like attending art exhibitions"},
-            {"id": "S3", "type": "S", "question": "I enjoy volunteering for good causes"},
-            {"id": "E3", "type": "E", "question": "I like starting new businesses or projects"},
-            {"id": "C3", "type": "C", "question": "I prefer following established procedures"},
-            {"id": "R4", "type": "R", "question": "I enjoy building or fixing things"},
-            {"id": "I4", "type": "I", "question": "I like theoretical discussions"},
-            {"id": "A4", "type": "A", "question": "I enjoy music and performing arts"},
-            {"id": "S4", "type": "S", "question": "I like counseling people with problems"},
-            {"id": "E4", "type": "E", "question": "I enjoy making sales presentations"},
-            {"id": "C4", "type": "C", "question": "I like keeping accurate records"},
-            {"id": "R5", "type": "R", "question": "I prefer working with my hands"},
-            {"id": "I5", "type": "I", "question": "I enjoy conducting research"},
-            {"id": "A5", "type": "A", "question": "I like designing things"},
-            {"id": "S5", "type": "S", "question": "I enjoy working with children"},
-            {"id": "E5", "type": "E", "question": "I like managing people and projects"},
-            {"id": "C5", "type": "C", "question": "I prefer routine, predictable work"}
-        ]
+        # Question bank is serialized once at startup; only the session id is spliced in
+        return question_bank_response(
+            question_bank.start_body(session_id),
+            question_bank.start_body_gzip(session_id)
+        )
 
-        # Quiz Questions
-        quiz_questions = [
-            {
-                "id": "academic_performance",
-                "question": "What is your average academic percentage?",
-                "type": "numeric",
-                "range": [40, 100]
-            },
-            {
-                "id": "course_preference", 
-                "question": "Which course type interests you most?",
-                "type": "single_choice",
-                "options": {
-                    "engineering": "Engineering (B.Tech)",
-                    "medical": "Medical (MBBS)",  
-                    "commerce": "Commerce (B.Com)",
-                    "arts": "Arts (BA)",
-                    "science": "Science (B.Sc)",
-                    "management": "Management (BBA)",
-                    "pharmacy": "Pharmacy (B.Pharm)"
-                }
-            }
-        ]
+    except Exception as e:
+        return jsonify({
+            "status": "error",
+            "message": str(e)
+        }), 500
+
+def build_recommendations(session_id, riasec_scores, holland_code, responses):
+    # Everything but the session id and timestamp depends only on the scores and
+    # quiz answers, so identical profiles reuse the cached bundle
+    answers = {question_id: answer for question_id, answer in responses.items() if not is_riasec_question(question_id)}
+    version = (catalog.snapshot().version, admission_model.version)
+    cache_key = (holland_code,) + recommendation_cache.key(riasec_scores, answers)
+
+    bundle = recommendation_cache.get(version, cache_key)
+    if bundle is None:
+        # Get course recommendations
+        course_recommendations = get_course_recommendations(riasec_scores, responses)
+
+        # Get college recommendations
+        college_recommendations = get_college_recommendations(course_recommendations, responses)
 
+        # Generate insights
+        insights = generate_insights(holland_code, riasec_scores)
+
+        bundle = recommendation_cache.put(version, cache_key, (
+            course_recommendations,
+            college_recommendations,
+            insights,
+            get_personality_description(holland_code[0] if holland_code else 'R'),
+            get_full_personality_description(holland_code)
+        ))
+
+    course_recommendations, college_recommendations, insights, primary_type, personality_description = bundle
+
+    # Create comprehensive recommendations
+    return {
+        "session_id": session_id,
+        "personality_analysis": {
+            "riasec_scores": riasec_scores,
+            "holland_code": holland_code,
+            "primary_type": primary_type,
+            "personality_description": personality_description
+        },
+        "course_recommendations": course_recommendations,
+        "college_recommendations": college_recommendations,
+        "personalized_insights": insights,
+        "generated_at": datetime.now().isoformat()
+    }
+
+def assessment_row(session_id, student_name, riasec_scores, holland_code, responses, recommendations):
+    # Stored compactly: recommendations become course codes and college ids
+    # (assessment_store.py), rehydrated by stored_recommendations()
+    return pack_assessment(session_id, student_name, riasec_scores, holland_code, responses, recommendations,
+                           catalog.snapshot().version)
+
+def stored_recommendations(record):
+    if record['legacy_recommendations'] is not None:
+        return record['legacy_recommendations']
+
+    riasec_scores = record['riasec_scores']
+    holland_code = record['holland_code']
+
+    # Colleges are described from the current catalog; catalog_version tells
+    # whether it is the one the recommendation was made from
+    snapshot = catalog.snapshot()
+    near = student_location(record['responses'])
+    college_recommendations = []
+    for college_id, admission_probability in record['colleges']:
+        college = snapshot.by_id.get(college_id)
+        entry = build_college_recommendation(college) if college else {"college_id": college_id}
+        entry['admission_probability'] = admission_probability
+        if college and near is not None:
+            entry['distance_km'] = snapshot.distance_km(college, near)
+        college_recommendations.append(entry)
+
+    return {
+        "session_id": record['session_id'],
+        "personality_analysis": {
+            "riasec_scores": riasec_scores,
+            "holland_code": holland_code,
+            "primary_type": get_personality_description(holland_code[0] if holland_code else 'R'),
+            "personality_description": get_full_personality_description(holland_code)
+        },
+        "course_recommendations": [course_recommendation(*course) for course in record['courses']],
+        "college_recommendations": college_recommendations,
+        "personalized_insights": generate_insights(holland_code, riasec_scores),
+        "generated_at": str(record['created_at']).replace(' ', 'T')
+    }
+
+@app.route('/api/assessment/<session_id>')
+def get_assessment(session_id):
+    try:
+        with pool.connection() as conn:
+            cursor = conn.execute(SELECT_ASSESSMENT_SQL, (session_id,))
+            row = cursor.fetchone()
+            columns = [desc[0] for desc in cursor.description]
+        if row is None:
+            return jsonify({"status": "error", "message": "Assessment not found"}), 404
+
+        record = unpack_assessment(dict(zip(columns, row)))
         return jsonify({
             "status": "success",
             "session_id": session_id,
-            "riasec_questions": riasec_questions,
-            "quiz_questions": quiz_questions
+            "student_name": record['student_name'],
+            "created_at": record['created_at'],
+            "catalog_version": record['catalog_version'],
+            "current_catalog": record['catalog_version'] == catalog.snapshot().version,
+            "responses": record['responses'],
+            "recommendations": stored_recommendations(record)
         })
 
     except Exception as e:
@@ -183,52 +556,24 @@ def submit_assessment():
         # Generate Holland Code
         holland_code = generate_holland_code(riasec_scores)
 
-        # Get course recommendations
-        course_recommendations = get_course_recommendations(riasec_scores, responses)
-
-        # Get college recommendations  
-        college_recommendations = get_college_recommendations(course_recommendations)
+        recommendations = build_recommendations(session_id, riasec_scores, holland_code, responses)
 
-        # Generate insights
-        insights = generate_insights(holland_code, riasec_scores)
-
-        # Create comprehensive recommendations
-        recommendations = {
-            "session_id": session_id,
-            "personality_analysis": {
-                "riasec_scores": riasec_scores,
-                "holland_code": holland_code,
-                "primary_type": get_personality_description(holland_code[0] if holland_code else 'R'),
-                "personality_description": get_full_personality_description(holland_code)
-            },
-            "course_recommendations": course_recommendations,
-            "college_recommendations": college_recommendations,
-            "personalized_insights": insights,
-            "generated_at": datetime.now().isoformat()
-        }
-
-        # Store in database
+        # Store in database - queued for the background writer, never blocks on disk
         try:
-            conn = sqlite3.connect('career_guidance.db')
-            cursor = conn.cursor()
-            cursor.execute('''
-                INSERT OR REPLACE INTO assessments 
-                (session_id, student_name, riasec_scores, holland_code, quiz_responses, recommendations)
-                VALUES (?, ?, ?, ?, ?, ?)
-            ''', (
+            assessment_writer.submit(assessment_row(
                 session_id,
                 data.get('student_name', 'Anonymous'),
-                json.dumps(riasec_scores),
+                riasec_scores,
                 holland_code,
-                json.dumps(responses),
-                json.dumps(recommendations, default=str)
+                responses,
+                recommendations
             ))
-            conn.commit()
-            conn.close()
         except Exception as db_error:
             print(f"Database storage error: {db_error}")
             # Continue even if database storage fails
 
+        profile_index.add(session_id, riasec_scores, holland_code, top_course(recommendations))
+
         return jsonify({
             "status": "success",
             "recommendations": recommendations
@@ -240,6 +585,168 @@ def submit_assessment():
             "message": str(e)
         }), 500
 
+@app.route('/api/assessment/submit_batch', methods=['POST'])
+def submit_assessment_batch():
+    try:
+        if 'file' in request.files:
+            assessments = read_csv_batch(request.files['file'].stream, MAX_BATCH_SIZE)
+        else:
+            data = request.get_json(silent=True) or {}
+            assessments = data.get('assessments') or []
+            if not isinstance(assessments, list) or not all(isinstance(a, dict) for a in assessments):
+                return jsonify({"status": "error", "message": "assessments must be a list of objects"}), 400
+
+        if not assessments:
+            return jsonify({"status": "error", "message": "No assessments provided"}), 400
+        if len(assessments) > MAX_BATCH_SIZE:
+            return jsonify({"status": "error", "message": f"Batch is limited to {MAX_BATCH_SIZE} assessments"}), 400
+
+        # RIASEC sums, normalization and Holland codes for the whole class at once
+        response_sets = [a.get('responses') or {} for a in assessments]
+        with metrics.timer('career_function_duration_seconds', function='score_batch'):
+            all_scores, all_codes = score_batch(response_sets)
+
+        results = []
+        rows = []
+        for assessment, responses, riasec_scores, holland_code in zip(assessments, response_sets, all_scores, all_codes):
+            session_id = assessment.get('session_id') or f"session_{datetime.now().strftime('%Y%m%d_%H%M%S')}_{str(uuid.uuid4())[:8]}"
+            recommendations = build_recommendations(session_id, riasec_scores, holland_code, responses)
+            results.append(recommendations)
+            profile_index.add(session_id, riasec_scores, holland_code, top_course(recommendations))
+            rows.append(assessment_row(
+                session_id,
+                assessment.get('student_name') or 'Anonymous',
+                riasec_scores,
+                holland_code,
+                responses,
+                recommendations
+            ))
+
+        # Queued as one unit so the writer commits the whole batch in one transaction
+        stored = True
+        try:
+            assessment_writer.submit_many(rows)
+        except Exception as db_error:
+            print(f"Database storage error: {db_error}")
+            stored = False
+
+        if request.accept_mimetypes.best == 'application/x-ndjson':
+            def generate():
+                for recommendations in results:
+                    yield json.dumps(recommendations, default=str) + '\n'
+            return Response(generate(), mimetype='application/x-ndjson', headers={"X-Batch-Stored": str(stored).lower()})
+
+        return jsonify({
+            "status": "success",
+            "count": len(results),
+            "stored": stored,
+            "results": results
+        })
+
+    except ValueError as e:
+        return jsonify({"status": "error", "message": str(e)}), 400
+
+    except Exception as e:
+        return jsonify({
+            "status": "error",
+            "message": str(e)
+        }), 500
+
+@app.route('/api/assessment/<session_id>/similar')
+def similar_students(session_id):
+    try:
+        k = min(max(request.args.get('k', 10, type=int), 1), MAX_NEIGHBOURS)
+        result = profile_index.similar(session_id, k)
+        if result is None:
+            return jsonify({"status": "error", "message": "Assessment not found"}), 404
+
+        # Other students are described by their profiles only, never their sessions
+        return jsonify(similar_students_body(session_id, k, result))
+
+    except Exception as e:
+        return jsonify({
+            "status": "error",
+            "message": str(e)
+        }), 500
+
+def similar_students_body(session_id, k, result):
+    course_counts = {}
+    for neighbour in result['neighbours']:
+        if neighbour['top_course']:
+            course_counts[neighbour['top_course']] = course_counts.get(neighbour['top_course'], 0) + 1
+
+    return {
+        "status": "success",
+        "session_id": session_id,
+        "holland_code": result['holland_code'],
+        "riasec_scores": result['riasec_scores'],
+        "k": k,
+        "count": len(result['neighbours']),
+        "similar_students": result['neighbours'],
+        "popular_courses": [
+            {"course": course, "students": count}
+            for course, count in sorted(course_counts.items(), key=lambda c: (-c[1], c[0]))
+        ]
+    }
+
+@app.route('/api/export/assessments')
+def export_assessments():
+    try:
+        export_format = request.args.get('format', 'csv')
+        start = request.args.get('start') or None
+        end = request.args.get('end') or None
+        try:
+            check_export(export_format, start, end)
+        except ValueError as e:
+            return jsonify({"status": "error", "message": str(e)}), 400
+
+        def generate():
+            # The pooled connection and its cursor live as long as the stream
+            with pool.connection() as conn:
+                yield from export_stream(conn, export_format, start, end)
+
+        return Response(generate(), content_type=EXPORT_FORMATS[export_format][0], headers={
+            "Content-Disposition": f'attachment; filename="{export_filename(export_format, start, end)}"'
+        })
+
+    except Exception as e:
+        return jsonify({"status": "error", "message": str(e)}), 500
+
+def analytics_response(report, statement, **kwargs):
+    try:
+        start, end = date_range(request.args.get('start'), request.args.get('end'))
+    except ValueError as e:
+        return jsonify({"status": "error", "message": str(e)}), 400
+
+    daily = request.args.get('daily', '').lower() in ('1', 'true', 'yes')
+    with pool.connection() as conn, \
+            metrics.timer('career_sqlite_query_duration_seconds', statement=statement):
+        result = report(conn, start, end, daily, **kwargs)
+    return jsonify(dict({"status": "success"}, **result))
+
+@app.route('/api/analytics/holland_codes')
+def analytics_holland_codes():
+    try:
+        return analytics_response(holland_code_report, 'analytics_holland')
+    except Exception as e:
+        return jsonify({"status": "error", "message": str(e)}), 500
+
+@app.route('/api/analytics/courses')
+def analytics_courses():
+    try:
+        limit = min(max(request.args.get('limit', 10, type=int), 1), 100)
+        return analytics_response(course_report, 'analytics_courses', limit=limit)
+    except Exception as e:
+        return jsonify({"status": "error", "message": str(e)}), 500
+
+@app.route('/api/analytics/regions')
+def analytics_regions():
+    try:
+        return analytics_response(region_report, 'analytics_regions')
+    except Exception as e:
+        return jsonify({"status": "error", "message": str(e)}), 500
+
+@metrics.timed('career_function_duration_seconds', function='calculate_riasec_scores')
 def calculate_riasec_scores(responses):
     scores = {"R": 0, "I": 0, "A": 0, "S": 0, "E": 0, "C": 0}
     counts = {"R": 0, "I": 0, "A": 0, "S": 0, "E": 0, "C": 0}
@@ -263,90 +770,67 @@ def generate_holland_code(riasec_scores):
     sorted_types = sorted(riasec_scores.items(), key=lambda x: x[1], reverse=True)
     return ''.join([t[0] for t in sorted_types[:3]])
 
-def get_course_recommendations(riasec_scores, responses):
-    # Course mapping based on RIASEC types
-    course_mapping = {
-        "R": [("B.Tech", 85), ("B.Sc", 70)],
-        "I": [("MBBS", 90), ("B.Tech", 80), ("B.Sc", 75)],
-        "A": [("BA", 85), ("Fine Arts", 90)],
-        "S": [("MBBS", 80), ("BA", 70), ("B.Ed", 85)],
-        "E": [("BBA", 85), ("B.Com", 75)],
-        "C": [("B.Com", 85), ("BBA", 70)]
-    }
-
-    recommendations = []
+# Static per-course fields, built on first use instead of on every recommendation
+COURSE_DETAILS = {}
 
-    # Get top 3 personality types
-    sorted_types = sorted(riasec_scores.items(), key=lambda x: x[1], reverse=True)[:3]
+def get_course_details(course):
+    details = COURSE_DETAILS.get(course)
+    if details is None:
+        details = COURSE_DETAILS[course] = (
+            get_full_course_name(course),
+            get_course_duration(course),
+            get_course_fees(course)
+        )
+    return details
 
-    for personality_type, score in sorted_types:
-        if personality_type in course_mapping:
-            for course, base_score in course_mapping[personality_type]:
-                # Adjust score based on personality strength
-                adjusted_score = min(95, int(base_score * (score / 100)))
-
-                if not any(r['course'] == course for r in recommendations):
-                    recommendations.append({
-                        "course": course,
-                        "full_name": get_full_course_name(course),
-                        "match_score": adjusted_score,
-                        "duration": get_course_duration(course),
-                        "avg_fees": get_course_fees(course),
-                        "recommendation_level": get_recommendation_level(adjusted_score),
-                        "reason": f"Strong match with your {get_personality_description(personality_type)} personality"
-                    })
+@metrics.timed('career_function_duration_seconds', function='get_course_recommendations')
+def get_course_recommendations(riasec_scores, responses):
+    # One product with the RIASEC x course weight matrix (data/course_weights.json);
+    # courses matching several of the top types combine their contributions
+    return [
+        course_recommendation(course, match_score, personality_type)
+        for course, match_score, personality_type in course_matrix.score(riasec_scores)
+    ]
+
+def course_recommendation(course, match_score, personality_type):
+    full_name, duration, avg_fees = get_course_details(course)
+    return {
+        "course": course,
+        "full_name": full_name,
+        "match_score": match_score,
+        "duration": duration,
+        "avg_fees": avg_fees,
+        "recommendation_level": get_recommendation_level(match_score),
+        "personality_type": personality_type,
+        "reason": f"Strong match with your {get_personality_description(personality_type)} personality"
+    }
 
-    return sorted(recommendations, key=lambda x: x['match_score'], reverse=True)
+def student_location(responses):
+    # (lat, lon) of the optional home_city quiz answer, if it is a known city
+    # and the distance term is on
+    city = (responses or {}).get('home_city')
+    if DISTANCE_BAND_KM <= 0 or not isinstance(city, str):
+        return None
+    return city_coordinates.locate(city)
 
-def get_college_recommendations(course_recommendations):
+@metrics.timed('career_function_duration_seconds', function='get_college_recommendations')
+def get_college_recommendations(course_recommendations, responses=None):
     if not course_recommendations:
         return []
 
     try:
-        conn = sqlite3.connect('career_guidance.db')
-        cursor = conn.cursor()
-
-        college_recs = []
-
-        for course in course_recommendations[:3]:  # Top 3 courses
-            cursor.execute('''
-                SELECT * FROM colleges 
-                WHERE course_type = ? 
-                ORDER BY (CASE WHEN is_government = 1 THEN 0 ELSE 1 END), avg_fee_annual
-                LIMIT 3
-            ''', (course['course'],))
-
-            columns = [desc[0] for desc in cursor.description]
-            colleges = [dict(zip(columns, row)) for row in cursor.fetchall()]
-
-            for college in colleges:
-                college_recs.append({
-                    "college_name": college['college_name'],
-                    "course_type": college['course_type'],
-                    "location": f"{college['city']}, {college['region']}",
-                    "annual_fee": college['avg_fee_annual'],
-                    "college_type": college['category'],
-                    "admission_mode": college['admission_mode'] or 'Merit-based',
-                    "admission_probability": calculate_admission_probability(college),
-                    "reason": f"Top choice for {course['course']}"
-                })
-
-        conn.close()
+        # Top colleges per course are precomputed with the catalog snapshot;
+        # with a home city they are ranked by distance band first
+        top_courses = [course['course'] for course in course_recommendations[:3]]  # Top 3 courses
+        college_recs, colleges = catalog.snapshot().top_candidates(top_courses, student_location(responses))
+        # All candidates scored in one model call; heuristic if no model is loaded
+        admission_model.apply(college_recs, colleges, responses)
         return college_recs[:6]  # Return top 6
 
     except Exception as e:
         print(f"Error getting college recommendations: {e}")
         return []
 
-def calculate_admission_probability(college):
-    # Simple probability based on college type and difficulty
-    base_prob = 0.7
-    if college.get('is_government') == 1:
-        base_prob *= 0.8  # Government colleges are more competitive
-    if college.get('admission_difficulty', 1) > 3:
-        base_prob *= 0.6  # High difficulty reduces probability
-    return min(0.95, max(0.3, base_prob))
-
 def generate_insights(holland_code, riasec_scores):
     insights = []
 
@@ -455,4 +939,5 @@ if __name__ == '__main__':
     print("✅ Assessment: http://localhost:5000/api/assessment/start")
     print("\nPress Ctrl+C to stop")
 
-    app.run(host='0.0.0.0', port=5000, debug=True)
+    # Development server only; use production_api.py to serve real traffic
+    app.run(host='0.0.0.0', port=5000, debug=os.environ.get('CAREER_DEBUG', '1') == '1')
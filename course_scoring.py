@@ -0,0 +1,63 @@
+#!/usr/bin/env python3
+"""
+RIASEC Course Scoring Matrix
+Career Guidance System
+"""
+
+import json
+import os
+
+import numpy as np
+
+from batch_scoring import RIASEC_TYPES
+
+COURSE_WEIGHTS_FILE = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'data', 'course_weights.json')
+
+# Only the student's strongest types take part, as in the Holland code
+TOP_TYPES = 3
+# A course reached through several of those types gets its strongest
+# contribution plus this share of the others
+SECONDARY_TYPE_WEIGHT = 0.25
+MAX_MATCH_SCORE = 95
+COURSE_RECOMMENDATION_LIMIT = 10
+
+
+class CourseWeightMatrix:
+    def __init__(self, path=COURSE_WEIGHTS_FILE):
+        with open(path, encoding='utf-8') as f:
+            data = json.load(f)
+
+        if tuple(data.get('types', RIASEC_TYPES)) != RIASEC_TYPES:
+            raise ValueError(f"{path}: types must be {', '.join(RIASEC_TYPES)}")
+
+        self.version = data['version']
+        self.courses = list(data['courses'])
+        # courses x types, weights 0-100
+        self.weights = np.array(
+            [[float(weights.get(t, 0)) for t in RIASEC_TYPES] for weights in data['courses'].values()]
+        ).reshape(len(self.courses), len(RIASEC_TYPES))
+
+    def score(self, riasec_scores, limit=COURSE_RECOMMENDATION_LIMIT):
+        # Returns [(course, match_score, strongest type)], best match first
+        values = [float(riasec_scores.get(t, 0) or 0) for t in RIASEC_TYPES]
+        top = sorted(range(len(RIASEC_TYPES)), key=lambda i: -values[i])[:TOP_TYPES]
+        profile = np.zeros(len(RIASEC_TYPES))
+        # A zero-score top type still links its courses (with a zero match)
+        profile[top] = [max(values[i], 1e-9) / 100 for i in top]
+
+        combined = self.weights @ profile
+        contributions = self.weights * profile
+        strongest = contributions.max(axis=1)
+        match = strongest + SECONDARY_TYPE_WEIGHT * (combined - strongest)
+
+        candidates = np.flatnonzero(match > 0)
+        if len(candidates) > limit:
+            candidates = candidates[np.argpartition(match[candidates], -limit)[-limit:]]
+
+        match_scores = np.minimum(MAX_MATCH_SCORE, match[candidates].astype(int)).tolist()
+        strongest_types = contributions[candidates].argmax(axis=1).tolist()
+        ranked = sorted(zip(match_scores, candidates.tolist(), strongest_types), key=lambda c: (-c[0], c[1]))
+        return [(self.courses[i], score, RIASEC_TYPES[t]) for score, i, t in ranked]
+
+
+course_matrix = CourseWeightMatrix()
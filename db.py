@@ -0,0 +1,184 @@
+#!/usr/bin/env python3
+"""
+SQLite Connection Pool
+Career Guidance System
+"""
+
+import os
+import queue
+import sqlite3
+import threading
+import time
+from contextlib import contextmanager
+
+DB_PATH = os.environ.get('CAREER_DB_PATH', 'career_guidance.db')
+POOL_SIZE = int(os.environ.get('CAREER_DB_POOL_SIZE', '8'))
+POOL_TIMEOUT = float(os.environ.get('CAREER_DB_POOL_TIMEOUT', '10'))
+
+# sqlite3 keeps a per-connection LRU of prepared statements keyed by SQL
+# text, so long-lived connections reuse them across requests.
+STATEMENT_CACHE_SIZE = 128
+
+PRAGMAS = (
+    "PRAGMA journal_mode = WAL",
+    "PRAGMA synchronous = NORMAL",
+    "PRAGMA cache_size = -16000",      # ~16 MB page cache per connection
+    "PRAGMA mmap_size = 268435456",    # 256 MB memory-mapped reads
+    "PRAGMA busy_timeout = 5000",
+    "PRAGMA temp_store = MEMORY",
+    "PRAGMA foreign_keys = ON",
+)
+
+
+class PoolTimeout(Exception):
+    pass
+
+
+class PooledConnection(sqlite3.Connection):
+    # Remembers which file it opened, so the pool can tell when the path has
+    # been replaced underneath it (fix_database.py --rebuild)
+    file_id = None
+
+
+def file_identity(path):
+    try:
+        st = os.stat(path)
+    except OSError:
+        return None
+    return (st.st_dev, st.st_ino)
+
+
+class ConnectionPool:
+    def __init__(self, db_path=DB_PATH, size=POOL_SIZE, timeout=POOL_TIMEOUT):
+        self.db_path = db_path
+        self.size = size
+        self.timeout = timeout
+        self._idle = queue.LifoQueue()
+        self._lock = threading.Lock()
+        self._created = 0
+        self._in_use = 0
+        self._acquired = 0
+        self._waits = 0
+        self._wait_time = 0.0
+        self._timeouts = 0
+        self._reopened = 0
+
+    def _connect(self):
+        conn = sqlite3.connect(
+            self.db_path,
+            timeout=self.timeout,
+            check_same_thread=False,
+            cached_statements=STATEMENT_CACHE_SIZE,
+            factory=PooledConnection
+        )
+        for pragma in PRAGMAS:
+            conn.execute(pragma)
+        conn.file_id = file_identity(self.db_path)
+        return conn
+
+    def acquire(self):
+        # A connection to a file that has since been replaced would read and
+        # write the unlinked inode; drop it and hand out a fresh one instead
+        while True:
+            conn = self._checkout()
+            current = file_identity(self.db_path)
+            if current is None or conn.file_id == current:
+                return conn
+            with self._lock:
+                self._in_use -= 1
+                self._acquired -= 1
+                self._created -= 1
+                self._reopened += 1
+            conn.close()
+
+    def _checkout(self):
+        try:
+            conn = self._idle.get_nowait()
+        except queue.Empty:
+            conn = None
+
+        if conn is None:
+            with self._lock:
+                can_create = self._created < self.size
+                if can_create:
+                    self._created += 1
+
+            if can_create:
+                try:
+                    conn = self._connect()
+                except Exception:
+                    with self._lock:
+                        self._created -= 1
+                    raise
+            else:
+                start = time.perf_counter()
+                try:
+                    conn = self._idle.get(timeout=self.timeout)
+                except queue.Empty:
+                    with self._lock:
+                        self._timeouts += 1
+                    raise PoolTimeout(f"No database connection available after {self.timeout}s")
+                finally:
+                    with self._lock:
+                        self._waits += 1
+                        self._wait_time += time.perf_counter() - start
+
+        with self._lock:
+            self._in_use += 1
+            self._acquired += 1
+        return conn
+
+    def release(self, conn):
+        try:
+            if conn.in_transaction:
+                conn.rollback()
+        except sqlite3.Error:
+            # Broken connection - drop it so a fresh one is created next time
+            with self._lock:
+                self._in_use -= 1
+                self._created -= 1
+            conn.close()
+            return
+
+        with self._lock:
+            self._in_use -= 1
+        self._idle.put(conn)
+
+    @contextmanager
+    def connection(self):
+        conn = self.acquire()
+        try:
+            yield conn
+        finally:
+            self.release(conn)
+
+    def close_all(self):
+        while True:
+            try:
+                conn = self._idle.get_nowait()
+            except queue.Empty:
+                break
+            conn.close()
+            with self._lock:
+                self._created -= 1
+
+    def stats(self):
+        with self._lock:
+            return {
+                "size": self.size,
+                "connections": self._created,
+                "in_use": self._in_use,
+                "idle": self._created - self._in_use,
+                "acquired": self._acquired,
+                "waits": self._waits,
+                "wait_time_ms": round(self._wait_time * 1000, 3),
+                "timeouts": self._timeouts,
+                "reopened": self._reopened
+            }
+
+
+pool = ConnectionPool()
+
+
+def get_connection():
+    return pool.connection()
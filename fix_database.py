@@ -1,12 +1,250 @@
 #!/usr/bin/env python3
 
+import argparse
+import csv
+import hashlib
+import json
 import sqlite3
-import pandas as pd
 import os
+import time
 from datetime import datetime
 
-def create_database_with_data():
-    db_path = 'career_guidance.db'
+from db import DB_PATH
+from migrations import migrate
+
+CSV_FILE = 'data/jk_colleges_clean.csv'
+CHUNK_SIZE = 5000
+
+# Pragmas for the bulk load only; the API switches the file to WAL afterwards
+LOADER_PRAGMAS = (
+    "PRAGMA journal_mode = MEMORY",
+    "PRAGMA synchronous = OFF",
+    "PRAGMA cache_size = -64000",
+    "PRAGMA temp_store = MEMORY",
+    "PRAGMA locking_mode = EXCLUSIVE",
+)
+
+def _text(default):
+    def coerce(value):
+        value = value.strip() if value is not None else ''
+        return value if value else default
+    return coerce
+
+def _real(default):
+    def coerce(value):
+        value = (value or '').strip().replace(',', '')
+        return float(value) if value else default
+    return coerce
+
+def _integer(default):
+    def coerce(value):
+        value = (value or '').strip()
+        return int(float(value)) if value else default
+    return coerce
+
+# Declared CSV schema: column, coercion (with default for empty cells)
+COLLEGE_SCHEMA = (
+    ('college_id', _text(None)),
+    ('college_name', _text('Unknown College')),
+    ('course_type', _text('General')),
+    ('category', _text('Unknown')),
+    ('region', _text('Unknown')),
+    ('city', _text('Unknown')),
+    ('avg_fee_annual', _real(0.0)),
+    ('admission_mode', _text('Merit-based')),
+    ('admission_difficulty', _integer(1)),
+    ('is_government', _integer(1)),
+    ('is_private', _integer(0)),
+    ('courses_offered', _text('General Courses')),
+    ('original_fee_structure', _text('Contact College')),
+    ('address', _text('Contact College for Address')),
+)
+
+COLLEGE_COLUMNS = [column for column, _ in COLLEGE_SCHEMA]
+
+INSERT_COLLEGE_SQL = f'''
+    INSERT INTO colleges ({', '.join(COLLEGE_COLUMNS)}, content_hash)
+    VALUES ({', '.join('?' for _ in COLLEGE_COLUMNS)}, ?)
+'''
+
+# Bulk load: a repeated college_id is skipped by the UNIQUE index instead of
+# aborting the transaction, without keeping every id in memory
+LOAD_COLLEGE_SQL = INSERT_COLLEGE_SQL.rstrip() + '\n    ON CONFLICT (college_id) DO NOTHING\n'
+
+UPDATE_COLLEGE_SQL = f'''
+    UPDATE colleges SET {', '.join(f'{column} = ?' for column in COLLEGE_COLUMNS[1:])}, content_hash = ?
+    WHERE college_id = ?
+'''
+
+DELETE_COLLEGE_SQL = 'DELETE FROM colleges WHERE college_id = ?'
+
+def content_hash(row):
+    payload = json.dumps(row, separators=(',', ':'), ensure_ascii=False).encode('utf-8')
+    return hashlib.blake2b(payload, digest_size=16).hexdigest()
+
+def read_college_rows(csv_file, errors):
+    # Streams coerced rows; memory use does not depend on the file size
+    with open(csv_file, newline='', encoding='utf-8-sig') as f:
+        reader = csv.DictReader(f)
+        for line_number, record in enumerate(reader, start=2):
+            try:
+                row = [coerce(record.get(column)) for column, coerce in COLLEGE_SCHEMA]
+                if row[0] is None:
+                    row[0] = f'COL_{line_number - 1:03d}'
+                row.append(content_hash(row))
+            except Exception as e:
+                # One bad row is skipped, never the whole load
+                errors.append((line_number, str(e)))
+                if len(errors) <= 10:
+                    print(f"⚠️ Skipping line {line_number}: {e}")
+                continue
+            yield row
+
+def chunked(rows, size):
+    chunk = []
+    for row in rows:
+        chunk.append(row)
+        if len(chunk) >= size:
+            yield chunk
+            chunk = []
+    if chunk:
+        yield chunk
+
+def drop_secondary_indexes(conn, table):
+    # Explicit indexes only; UNIQUE/PRIMARY KEY autoindexes cannot be dropped
+    indexes = conn.execute(
+        "SELECT name, sql FROM sqlite_master WHERE type = 'index' AND tbl_name = ? AND sql IS NOT NULL",
+        (table,)
+    ).fetchall()
+    for name, _ in indexes:
+        conn.execute(f'DROP INDEX "{name}"')
+    return [sql for _, sql in indexes]
+
+def drop_triggers(conn, prefix):
+    # Per-row trigger work (catalog revision bump, FTS sync) is pointless
+    # during a bulk load; the caller redoes it once instead
+    triggers = conn.execute(
+        "SELECT name, sql FROM sqlite_master WHERE type = 'trigger' AND name LIKE ?", (prefix + '%',)
+    ).fetchall()
+    for name, _ in triggers:
+        conn.execute(f'DROP TRIGGER "{name}"')
+    return [sql for _, sql in triggers]
+
+def load_colleges_csv(conn, csv_file, chunk_size=CHUNK_SIZE):
+    for pragma in LOADER_PRAGMAS:
+        conn.execute(pragma)
+
+    errors = []
+    inserted = 0
+    duplicates = 0
+    start = time.perf_counter()
+
+    with conn:
+        index_sql = drop_secondary_indexes(conn, 'colleges')
+        revision_sql = drop_triggers(conn, 'colleges_revision_')
+        fts_sql = drop_triggers(conn, 'colleges_fts_')
+        for chunk in chunked(read_college_rows(csv_file, errors), chunk_size):
+            # No triggers left, so total_changes counts exactly the rows inserted
+            before = conn.total_changes
+            conn.executemany(LOAD_COLLEGE_SQL, chunk)
+            added = conn.total_changes - before
+            inserted += added
+            duplicates += len(chunk) - added
+        for sql in index_sql + revision_sql + fts_sql:
+            conn.execute(sql)
+        if fts_sql:
+            conn.execute("INSERT INTO colleges_fts (colleges_fts) VALUES ('rebuild')")
+        if revision_sql:
+            conn.execute("UPDATE catalog_revision SET revision = revision + 1 WHERE id = 1")
+
+    elapsed = time.perf_counter() - start
+    rate = inserted / elapsed if elapsed > 0 else float(inserted)
+    print(f"✅ Successfully inserted {inserted} colleges in {elapsed:.2f}s ({rate:,.0f} rows/sec)")
+    if duplicates:
+        print(f"⚠️ Skipped {duplicates} rows with a duplicate college_id")
+    if errors:
+        print(f"⚠️ Skipped {len(errors)} invalid rows")
+
+    conn.execute("PRAGMA locking_mode = NORMAL")
+    conn.execute("PRAGMA journal_mode = WAL")
+    return inserted
+
+def sync_colleges_csv(conn, csv_file, chunk_size=CHUNK_SIZE):
+    # Diff the CSV against the table by college_id + content hash and apply
+    # only the changes, in one transaction. Readers in WAL mode keep seeing
+    # the old catalog until the commit, and row ids stay stable.
+    conn.execute("PRAGMA busy_timeout = 5000")
+    migrate(conn, verbose=True)
+
+    existing = dict(conn.execute("SELECT college_id, content_hash FROM colleges"))
+    seen = set()
+    errors = []
+    inserted = updated = unchanged = 0
+    start = time.perf_counter()
+
+    with conn:
+        for chunk in chunked(read_college_rows(csv_file, errors), chunk_size):
+            inserts = []
+            updates = []
+            for row in chunk:
+                college_id, row_hash = row[0], row[-1]
+                if college_id in seen:
+                    continue
+                seen.add(college_id)
+                if college_id not in existing:
+                    inserts.append(row)
+                elif existing[college_id] != row_hash:
+                    updates.append(row[1:] + [college_id])
+                else:
+                    unchanged += 1
+            if inserts:
+                conn.executemany(INSERT_COLLEGE_SQL, inserts)
+            if updates:
+                conn.executemany(UPDATE_COLLEGE_SQL, updates)
+            inserted += len(inserts)
+            updated += len(updates)
+
+        removed = [(college_id,) for college_id in existing if college_id not in seen]
+        conn.executemany(DELETE_COLLEGE_SQL, removed)
+
+    elapsed = time.perf_counter() - start
+    print(f"✅ Sync complete in {elapsed:.2f}s: {inserted} inserted, {updated} updated, "
+          f"{len(removed)} deleted, {unchanged} unchanged")
+    if errors:
+        print(f"⚠️ Skipped {len(errors)} invalid rows")
+    return inserted, updated, len(removed)
+
+def sync_database_with_csv(db_path=DB_PATH, csv_file=CSV_FILE, chunk_size=CHUNK_SIZE):
+    print("🔄 Syncing college catalog with CSV...")
+    print("=" * 50)
+
+    try:
+        conn = sqlite3.connect(db_path)
+        sync_colleges_csv(conn, csv_file, chunk_size)
+        college_count = conn.execute('SELECT COUNT(*) FROM colleges').fetchone()[0]
+        conn.close()
+
+        print(f"✅ Database file: {db_path}")
+        print(f"✅ Colleges loaded: {college_count}")
+        print("✅ Running API servers pick up the new catalog automatically")
+        return True
+
+    except Exception as e:
+        print(f"❌ Catalog sync failed: {e}")
+        return False
+
+def database_has_catalog(db_path):
+    if not os.path.exists(db_path):
+        return False
+    conn = sqlite3.connect(db_path)
+    try:
+        return conn.execute(
+            "SELECT 1 FROM sqlite_master WHERE type = 'table' AND name = 'colleges'"
+        ).fetchone() is not None
+    finally:
+        conn.close()
+
+def create_database_with_data(db_path=DB_PATH, csv_file=CSV_FILE, chunk_size=CHUNK_SIZE):
 
     print("🗄️ Creating database and loading data...")
     print("=" * 50)
@@ -16,6 +254,9 @@ def create_database_with_data():
         if os.path.exists(db_path):
             os.remove(db_path)
             print("🗑️ Removed existing database")
+        for suffix in ('-wal', '-shm'):
+            if os.path.exists(db_path + suffix):
+                os.remove(db_path + suffix)
 
         # Create new database connection
         conn = sqlite3.connect(db_path)
@@ -23,85 +264,15 @@ def create_database_with_data():
 
         print("📊 Creating database tables...")
 
-        # Create colleges table
-        cursor.execute('''
-            CREATE TABLE colleges (
-                id INTEGER PRIMARY KEY AUTOINCREMENT,
-                college_id TEXT UNIQUE NOT NULL,
-                college_name TEXT NOT NULL,
-                course_type TEXT NOT NULL,
-                category TEXT NOT NULL,
-                region TEXT NOT NULL,
-                city TEXT NOT NULL,
-                avg_fee_annual REAL NOT NULL,
-                admission_mode TEXT,
-                admission_difficulty INTEGER DEFAULT 1,
-                is_government INTEGER DEFAULT 0,
-                is_private INTEGER DEFAULT 0,
-                courses_offered TEXT,
-                original_fee_structure TEXT,
-                address TEXT,
-                created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
-            )
-        ''')
-
-        # Create assessments table
-        cursor.execute('''
-            CREATE TABLE assessments (
-                id INTEGER PRIMARY KEY AUTOINCREMENT,
-                session_id TEXT UNIQUE NOT NULL,
-                student_name TEXT,
-                riasec_scores TEXT,
-                holland_code TEXT,
-                quiz_responses TEXT,
-                recommendations TEXT,
-                created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
-            )
-        ''')
+        # Tables and indexes come from the versioned migrations
+        migrate(conn)
 
         print("✅ Database tables created successfully")
 
         # Load college data if CSV exists
-        csv_file = 'data/jk_colleges_clean.csv'
         if os.path.exists(csv_file):
-            print(f"📈 Loading college data from {csv_file}...")
-
-            df = pd.read_csv(csv_file)
-            print(f"📊 Found {len(df)} colleges in CSV")
-
-            # Insert college data
-            inserted = 0
-            for _, row in df.iterrows():
-                try:
-                    cursor.execute('''
-                        INSERT INTO colleges (
-                            college_id, college_name, course_type, category, region,
-                            city, avg_fee_annual, admission_mode, admission_difficulty,
-                            is_government, is_private, courses_offered, 
-                            original_fee_structure, address
-                        ) VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)
-                    ''', (
-                        str(row.get('college_id', f'COL_{inserted+1:03d}')),
-                        str(row.get('college_name', 'Unknown College')),
-                        str(row.get('course_type', 'General')),
-                        str(row.get('category', 'Unknown')),
-                        str(row.get('region', 'Unknown')),
-                        str(row.get('city', 'Unknown')),
-                        float(row.get('avg_fee_annual', 0)),
-                        str(row.get('admission_mode', 'Merit-based')),
-                        int(row.get('admission_difficulty', 1)),
-                        int(row.get('is_government', 1)),
-                        int(row.get('is_private', 0)),
-                        str(row.get('courses_offered', 'General Courses')),
-                        str(row.get('original_fee_structure', 'Contact College')),
-                        str(row.get('address', 'Contact College for Address'))
-                    ))
-                    inserted += 1
-                except Exception as e:
-                    print(f"⚠️ Error inserting row {inserted + 1}: {e}")
-                    continue
-
-            print(f"✅ Successfully inserted {inserted} colleges")
+            print(f"📈 Streaming college data from {csv_file}...")
+            load_colleges_csv(conn, csv_file, chunk_size)
 
         else:
             print("⚠️ CSV file not found, creating with sample data...")
@@ -152,7 +323,21 @@ def create_database_with_data():
         return False
 
 if __name__ == "__main__":
-    success = create_database_with_data()
+    parser = argparse.ArgumentParser(description="Create the career guidance database and load colleges")
+    parser.add_argument('--csv', default=CSV_FILE, help="College CSV file to load")
+    parser.add_argument('--db', default=DB_PATH, help="SQLite database file")
+    parser.add_argument('--chunk-size', type=int, default=CHUNK_SIZE, help="Rows per executemany batch")
+    parser.add_argument('--rebuild', action='store_true',
+                        help="Delete and recreate the database instead of syncing it in place")
+    args = parser.parse_args()
+
+    if args.rebuild or not database_has_catalog(args.db):
+        success = create_database_with_data(args.db, args.csv, args.chunk_size)
+    else:
+        if not os.path.exists(args.csv):
+            print(f"❌ CSV file not found: {args.csv}")
+            raise SystemExit(1)
+        success = sync_database_with_csv(args.db, args.csv, args.chunk_size)
 
     if success:
         print("\n🚀 READY TO START API SERVER!")
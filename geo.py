@@ -0,0 +1,130 @@
+#!/usr/bin/env python3
+"""
+City Coordinates and Spatial Grid Index
+Career Guidance System
+
+Colleges only carry city and region names; data/city_coordinates.csv gives
+each city a latitude/longitude, joined to the catalog when it loads. Points
+are bucketed into a fixed-degree grid so radius and k-nearest queries only
+look at the cells around the query point.
+"""
+
+import csv
+import math
+import os
+
+CITY_COORDINATES_FILE = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'data', 'city_coordinates.csv')
+
+EARTH_RADIUS_KM = 6371.0
+KM_PER_DEGREE = math.pi * EARTH_RADIUS_KM / 180
+# Half the earth's circumference: no two points are further apart
+MAX_DISTANCE_KM = math.pi * EARTH_RADIUS_KM
+
+# ~55 km cells: a typical radius query touches a handful of cells
+GRID_CELL_DEGREES = 0.5
+# First radius tried by a k-nearest query; doubled until k points are found
+KNN_START_RADIUS_KM = 25.0
+
+
+def haversine_km(lat1, lon1, lat2, lon2):
+    phi1, phi2 = math.radians(lat1), math.radians(lat2)
+    dphi = phi2 - phi1
+    dlambda = math.radians(lon2 - lon1)
+    a = math.sin(dphi / 2) ** 2 + math.cos(phi1) * math.cos(phi2) * math.sin(dlambda / 2) ** 2
+    return 2 * EARTH_RADIUS_KM * math.asin(min(1.0, math.sqrt(a)))
+
+
+def valid_coordinates(lat, lon):
+    return lat is not None and lon is not None and -90 <= lat <= 90 and -180 <= lon <= 180
+
+
+class CityCoordinates:
+    def __init__(self, path=CITY_COORDINATES_FILE):
+        self.by_city_region = {}
+        self.by_city = {}
+        if not os.path.exists(path):
+            return
+        with open(path, newline='', encoding='utf-8') as f:
+            for row in csv.DictReader(f):
+                point = (float(row['latitude']), float(row['longitude']))
+                city = row['city'].strip().lower()
+                self.by_city_region[(city, row['region'].strip().lower())] = point
+                # A city name shared by two regions is only found with its region
+                self.by_city[city] = point if city not in self.by_city else None
+
+    def __len__(self):
+        return len(self.by_city_region)
+
+    def locate(self, city, region=None):
+        city = (city or '').strip().lower()
+        if region:
+            point = self.by_city_region.get((city, region.strip().lower()))
+            if point is not None:
+                return point
+        return self.by_city.get(city)
+
+
+class GridIndex:
+    # Items are (lat, lon, value); queries return [(distance_km, value)],
+    # nearest first
+    def __init__(self, items, cell_degrees=GRID_CELL_DEGREES):
+        self.cell_degrees = cell_degrees
+        self.cells = {}
+        self.size = 0
+        for lat, lon, value in items:
+            self.cells.setdefault(self._cell(lat, lon), []).append((lat, lon, value))
+            self.size += 1
+
+    def __len__(self):
+        return self.size
+
+    def _cell(self, lat, lon):
+        return int(math.floor(lat / self.cell_degrees)), int(math.floor(lon / self.cell_degrees))
+
+    def _candidate_cells(self, lat, lon, radius_km):
+        # Cells overlapping the bounding box of the radius; past the poles or
+        # once the box is larger than the populated grid, every cell
+        lat_span = radius_km / KM_PER_DEGREE
+        if abs(lat) + lat_span >= 90:
+            return self.cells.values()
+        lon_span = radius_km / (KM_PER_DEGREE * math.cos(math.radians(abs(lat) + lat_span)))
+        if lon_span >= 180:
+            return self.cells.values()
+
+        row_min, col_min = self._cell(lat - lat_span, lon - lon_span)
+        row_max, col_max = self._cell(lat + lat_span, lon + lon_span)
+        if (row_max - row_min + 1) * (col_max - col_min + 1) >= len(self.cells):
+            return self.cells.values()
+        # Columns past +/-180 degrees wrap around to the other side
+        columns = round(360 / self.cell_degrees)
+        keys = {
+            (row, (col + columns // 2) % columns - columns // 2)
+            for row in range(row_min, row_max + 1)
+            for col in range(col_min, col_max + 1)
+        }
+        return [self.cells[key] for key in keys if key in self.cells]
+
+    def within(self, lat, lon, radius_km):
+        found = []
+        for cell in self._candidate_cells(lat, lon, radius_km):
+            for point_lat, point_lon, value in cell:
+                distance = haversine_km(lat, lon, point_lat, point_lon)
+                if distance <= radius_km:
+                    found.append((distance, value))
+        found.sort(key=lambda item: item[0])
+        return found
+
+    def nearest(self, lat, lon, k):
+        # Exact: every point within the final radius is considered, and the
+        # radius only stops growing once it holds at least k points
+        if k <= 0 or not self.size:
+            return []
+        radius = KNN_START_RADIUS_KM
+        while True:
+            found = self.within(lat, lon, radius)
+            if len(found) >= k or radius >= MAX_DISTANCE_KM:
+                return found[:k]
+            radius = min(radius * 2, MAX_DISTANCE_KM)
+
+
+city_coordinates = CityCoordinates()
@@ -0,0 +1,180 @@
+#!/usr/bin/env python3
+"""
+Prometheus Metrics
+Career Guidance System
+"""
+
+import threading
+import time
+import weakref
+from bisect import bisect_left
+from contextlib import contextmanager
+from functools import wraps
+
+LATENCY_BUCKETS = (0.0005, 0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0)
+
+CONTENT_TYPE = 'text/plain; version=0.0.4; charset=utf-8'
+
+
+class _Shard:
+    # Written only by its owning thread, so recording never takes a lock
+    def __init__(self):
+        self.counters = {}
+        self.histograms = {}
+
+
+def _merge(target, source):
+    for key, value in list(source.counters.items()):
+        target.counters[key] = target.counters.get(key, 0) + value
+    for key, values in list(source.histograms.items()):
+        merged = target.histograms.setdefault(key, [0] * (len(LATENCY_BUCKETS) + 3))
+        for i, value in enumerate(list(values)):
+            merged[i] += value
+
+
+def _escape(value):
+    return str(value).replace('\\', '\\\\').replace('"', '\\"').replace('\n', '\\n')
+
+
+def _labels(labels, extra=()):
+    pairs = list(labels) + list(extra)
+    if not pairs:
+        return ''
+    return '{' + ','.join(f'{name}="{_escape(value)}"' for name, value in pairs) + '}'
+
+
+class MetricsRegistry:
+    def __init__(self):
+        self._local = threading.local()
+        self._lock = threading.Lock()
+        self._shards = []
+        self._retired = _Shard()
+        self._help = {}
+
+    def describe(self, name, kind, help_text):
+        self._help[name] = (kind, help_text)
+
+    def _shard(self):
+        shard = getattr(self._local, 'shard', None)
+        if shard is None:
+            shard = _Shard()
+            self._local.shard = shard
+            # Only the first metric a thread records takes the lock
+            with self._lock:
+                self._shards.append((weakref.ref(threading.current_thread()), shard))
+        return shard
+
+    def inc(self, name, value=1, **labels):
+        counters = self._shard().counters
+        key = (name, tuple(sorted(labels.items())))
+        counters[key] = counters.get(key, 0) + value
+
+    def observe(self, name, seconds, **labels):
+        histograms = self._shard().histograms
+        key = (name, tuple(sorted(labels.items())))
+        values = histograms.get(key)
+        if values is None:
+            # One slot per bucket, then +Inf, sum and count
+            values = histograms[key] = [0] * (len(LATENCY_BUCKETS) + 3)
+        values[bisect_left(LATENCY_BUCKETS, seconds)] += 1
+        values[-2] += seconds
+        values[-1] += 1
+
+    @contextmanager
+    def timer(self, name, **labels):
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.observe(name, time.perf_counter() - start, **labels)
+
+    def timed(self, name, **labels):
+        def decorator(func):
+            @wraps(func)
+            def wrapper(*args, **kwargs):
+                start = time.perf_counter()
+                try:
+                    return func(*args, **kwargs)
+                finally:
+                    self.observe(name, time.perf_counter() - start, **labels)
+            return wrapper
+        return decorator
+
+    def collect(self):
+        total = _Shard()
+        with self._lock:
+            live = []
+            for thread_ref, shard in self._shards:
+                thread = thread_ref()
+                if thread is None or not thread.is_alive():
+                    # Fold finished threads into one shard so the list stays small
+                    _merge(self._retired, shard)
+                else:
+                    live.append((thread_ref, shard))
+            self._shards = live
+            _merge(total, self._retired)
+            for _, shard in live:
+                _merge(total, shard)
+        return total
+
+    def render(self, gauges=()):
+        total = self.collect()
+        lines = []
+        seen = set()
+
+        def header(name, default_kind):
+            if name in seen:
+                return
+            seen.add(name)
+            kind, help_text = self._help.get(name, (default_kind, name))
+            lines.append(f'# HELP {name} {help_text}')
+            lines.append(f'# TYPE {name} {kind}')
+
+        for (name, labels), value in sorted(total.counters.items()):
+            header(name, 'counter')
+            lines.append(f'{name}{_labels(labels)} {value}')
+
+        for (name, labels), values in sorted(total.histograms.items()):
+            header(name, 'histogram')
+            cumulative = 0
+            for bound, count in zip(LATENCY_BUCKETS, values):
+                cumulative += count
+                lines.append(f'{name}_bucket{_labels(labels, [("le", bound)])} {cumulative}')
+            cumulative += values[len(LATENCY_BUCKETS)]
+            lines.append(f'{name}_bucket{_labels(labels, [("le", "+Inf")])} {cumulative}')
+            lines.append(f'{name}_sum{_labels(labels)} {values[-2]:.6f}')
+            lines.append(f'{name}_count{_labels(labels)} {values[-1]}')
+
+        for name, labels, value in gauges:
+            header(name, 'gauge')
+            lines.append(f'{name}{_labels(sorted(labels.items()))} {value}')
+
+        return '\n'.join(lines) + '\n'
+
+
+metrics = MetricsRegistry()
+
+metrics.describe('career_http_requests_total', 'counter', 'HTTP requests by route, method and status code')
+metrics.describe('career_http_request_duration_seconds', 'histogram', 'HTTP request latency by route')
+metrics.describe('career_http_requests_in_flight', 'gauge', 'HTTP requests currently being handled')
+metrics.describe('career_sqlite_query_duration_seconds', 'histogram', 'SQLite statement execution time by statement')
+metrics.describe('career_function_duration_seconds', 'histogram', 'Time spent in scoring and recommendation functions')
+metrics.describe('career_response_cache_hits_total', 'counter', 'Catalog response cache hits')
+metrics.describe('career_response_cache_misses_total', 'counter', 'Catalog response cache misses')
+metrics.describe('career_response_cache_hit_ratio', 'gauge', 'Catalog response cache hit ratio')
+metrics.describe('career_response_cache_entries', 'gauge', 'Serialized responses held in the cache')
+metrics.describe('career_recommendation_cache_hits_total', 'counter', 'Assessments served from the recommendation cache')
+metrics.describe('career_recommendation_cache_misses_total', 'counter', 'Assessments whose recommendations were computed')
+metrics.describe('career_recommendation_cache_hit_ratio', 'gauge', 'Recommendation cache hit ratio')
+metrics.describe('career_recommendation_cache_entries', 'gauge', 'Recommendation bundles held in the cache')
+metrics.describe('career_db_pool_connections', 'gauge', 'Open pooled SQLite connections')
+metrics.describe('career_db_pool_in_use', 'gauge', 'Pooled SQLite connections checked out')
+metrics.describe('career_db_pool_waits_total', 'counter', 'Connection checkouts that had to wait')
+metrics.describe('career_db_pool_wait_seconds_total', 'counter', 'Total time spent waiting for a connection')
+metrics.describe('career_writer_queue_depth', 'gauge', 'Assessments waiting for the background writer')
+metrics.describe('career_writer_rows_written_total', 'counter', 'Assessments committed by the background writer')
+metrics.describe('career_writer_rows_failed_total', 'counter', 'Assessments the background writer could not store')
+metrics.describe('career_writer_batches_total', 'counter', 'Group commits made by the background writer')
+metrics.describe('career_catalog_colleges', 'gauge', 'Colleges in the loaded catalog snapshot')
+metrics.describe('career_catalog_reloads_total', 'counter', 'Catalog snapshot reloads')
+metrics.describe('career_profile_index_profiles', 'gauge', 'Score profiles in the similar-student index')
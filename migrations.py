@@ -0,0 +1,262 @@
+#!/usr/bin/env python3
+"""
+Versioned Schema Migrations
+Career Guidance System
+"""
+
+import argparse
+import json
+import sqlite3
+
+from db import DB_PATH
+from assessment_store import CREATE_ASSESSMENTS_SQL, ASSESSMENT_COLUMNS, pack_assessment
+from catalog import build_college_recommendation, recommendation_key
+from analytics import backfill as backfill_analytics
+
+SCHEMA_VERSION_SQL = '''
+    CREATE TABLE IF NOT EXISTS schema_version (
+        version INTEGER PRIMARY KEY,
+        description TEXT NOT NULL,
+        applied_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
+    )
+'''
+
+
+def _columns(conn, table):
+    return [row[1] for row in conn.execute(f"PRAGMA table_info({table})")]
+
+
+def create_base_tables(conn):
+    conn.execute('''
+        CREATE TABLE IF NOT EXISTS colleges (
+            id INTEGER PRIMARY KEY AUTOINCREMENT,
+            college_id TEXT UNIQUE NOT NULL,
+            college_name TEXT NOT NULL,
+            course_type TEXT NOT NULL,
+            category TEXT NOT NULL,
+            region TEXT NOT NULL,
+            city TEXT NOT NULL,
+            avg_fee_annual REAL NOT NULL,
+            admission_mode TEXT,
+            admission_difficulty INTEGER DEFAULT 1,
+            is_government INTEGER DEFAULT 0,
+            is_private INTEGER DEFAULT 0,
+            courses_offered TEXT,
+            original_fee_structure TEXT,
+            address TEXT,
+            created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
+        )
+    ''')
+    conn.execute('''
+        CREATE TABLE IF NOT EXISTS assessments (
+            id INTEGER PRIMARY KEY AUTOINCREMENT,
+            session_id TEXT UNIQUE NOT NULL,
+            student_name TEXT,
+            riasec_scores TEXT,
+            holland_code TEXT,
+            quiz_responses TEXT,
+            recommendations TEXT,
+            created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
+        )
+    ''')
+
+
+def add_content_hash(conn):
+    if 'content_hash' not in _columns(conn, 'colleges'):
+        conn.execute("ALTER TABLE colleges ADD COLUMN content_hash TEXT")
+
+
+def add_query_indexes(conn):
+    # Keyset listings of /api/colleges ordered by id: equality filter + id range
+    conn.execute("CREATE INDEX IF NOT EXISTS idx_colleges_course_id ON colleges (course_type, id)")
+    conn.execute("CREATE INDEX IF NOT EXISTS idx_colleges_region_id ON colleges (region, id)")
+    # Keyset listings ordered by fee: equality filter + fee range/order, with
+    # the rowid (id) as the implicit trailing key column
+    conn.execute("CREATE INDEX IF NOT EXISTS idx_colleges_course_fee ON colleges (course_type, avg_fee_annual)")
+    conn.execute("CREATE INDEX IF NOT EXISTS idx_colleges_region_fee ON colleges (region, avg_fee_annual)")
+    conn.execute("CREATE INDEX IF NOT EXISTS idx_colleges_category_fee ON colleges (category, avg_fee_annual)")
+    conn.execute("CREATE INDEX IF NOT EXISTS idx_colleges_government_fee ON colleges (is_government, avg_fee_annual)")
+    conn.execute("CREATE INDEX IF NOT EXISTS idx_colleges_fee ON colleges (avg_fee_annual)")
+    # Assessment date ranges (exports, retention, analytics backfill)
+    conn.execute("CREATE INDEX IF NOT EXISTS idx_assessments_created_at ON assessments (created_at)")
+    conn.execute("ANALYZE")
+
+
+def add_college_search(conn):
+    # External-content FTS5 index over colleges, kept in sync by triggers
+    conn.execute('''
+        CREATE VIRTUAL TABLE IF NOT EXISTS colleges_fts USING fts5(
+            college_name, courses_offered, city, address,
+            content='colleges', content_rowid='id',
+            tokenize='unicode61 remove_diacritics 2',
+            prefix='2 3 4'
+        )
+    ''')
+    conn.execute('''
+        CREATE TRIGGER IF NOT EXISTS colleges_fts_insert AFTER INSERT ON colleges BEGIN
+            INSERT INTO colleges_fts (rowid, college_name, courses_offered, city, address)
+            VALUES (new.id, new.college_name, new.courses_offered, new.city, new.address);
+        END
+    ''')
+    conn.execute('''
+        CREATE TRIGGER IF NOT EXISTS colleges_fts_delete AFTER DELETE ON colleges BEGIN
+            INSERT INTO colleges_fts (colleges_fts, rowid, college_name, courses_offered, city, address)
+            VALUES ('delete', old.id, old.college_name, old.courses_offered, old.city, old.address);
+        END
+    ''')
+    conn.execute('''
+        CREATE TRIGGER IF NOT EXISTS colleges_fts_update AFTER UPDATE ON colleges BEGIN
+            INSERT INTO colleges_fts (colleges_fts, rowid, college_name, courses_offered, city, address)
+            VALUES ('delete', old.id, old.college_name, old.courses_offered, old.city, old.address);
+            INSERT INTO colleges_fts (rowid, college_name, courses_offered, city, address)
+            VALUES (new.id, new.college_name, new.courses_offered, new.city, new.address);
+        END
+    ''')
+    conn.execute("INSERT INTO colleges_fts (colleges_fts) VALUES ('rebuild')")
+
+
+def add_catalog_revision(conn):
+    # Bumped by every change to colleges, so the API can tell catalog edits
+    # apart from assessment writes without reloading the catalog
+    conn.execute('''
+        CREATE TABLE IF NOT EXISTS catalog_revision (
+            id INTEGER PRIMARY KEY CHECK (id = 1),
+            revision INTEGER NOT NULL
+        )
+    ''')
+    conn.execute("INSERT OR IGNORE INTO catalog_revision (id, revision) VALUES (1, 0)")
+    for event in ('INSERT', 'UPDATE', 'DELETE'):
+        conn.execute(f'''
+            CREATE TRIGGER IF NOT EXISTS colleges_revision_{event.lower()} AFTER {event} ON colleges BEGIN
+                UPDATE catalog_revision SET revision = revision + 1 WHERE id = 1;
+            END
+        ''')
+
+
+def compact_assessments(conn):
+    # Rebuilds assessments with scores as columns and recommendations as
+    # references (assessment_store.py), keeping ids and timestamps. Run
+    # VACUUM afterwards to return the freed pages to the filesystem.
+    if 'score_r' in _columns(conn, 'assessments'):
+        return
+
+    # Stored entries carry no id, only the fields recommendation_key() reads.
+    # Colleges sharing a key can't be told apart (None); rows recommending
+    # one keep their full response instead of a guessed id.
+    college_ids = {}
+    cursor = conn.execute("SELECT * FROM colleges ORDER BY id")
+    columns = [desc[0] for desc in cursor.description]
+    for row in cursor:
+        college = dict(zip(columns, row))
+        key = recommendation_key(build_college_recommendation(college))
+        college_ids[key] = None if key in college_ids else college['id']
+
+    def college_id(recommendation):
+        return college_ids.get(recommendation_key(recommendation))
+
+    conn.execute(CREATE_ASSESSMENTS_SQL.format(table='assessments_compact'))
+    insert = (
+        f"INSERT INTO assessments_compact (id, {', '.join(ASSESSMENT_COLUMNS)}, created_at) "
+        f"VALUES (?, {', '.join('?' for _ in ASSESSMENT_COLUMNS)}, ?)"
+    )
+    cursor = conn.execute('''
+        SELECT id, session_id, student_name, riasec_scores, holland_code, quiz_responses, recommendations, created_at
+        FROM assessments ORDER BY id
+    ''')
+    while True:
+        rows = cursor.fetchmany(1000)
+        if not rows:
+            break
+        conn.executemany(insert, [
+            (row_id,) + pack_assessment(
+                session_id,
+                student_name,
+                json.loads(riasec_scores or '{}'),
+                holland_code,
+                json.loads(quiz_responses or '{}'),
+                json.loads(recommendations or '{}'),
+                None,
+                college_id
+            ) + (created_at,)
+            for row_id, session_id, student_name, riasec_scores, holland_code, quiz_responses, recommendations,
+            created_at in rows
+        ])
+
+    conn.execute("DROP TABLE assessments")
+    conn.execute("ALTER TABLE assessments_compact RENAME TO assessments")
+    conn.execute("CREATE INDEX IF NOT EXISTS idx_assessments_created_at ON assessments (created_at)")
+
+
+def add_analytics_rollups(conn):
+    # Daily rollup tables (analytics.py), counted from the existing rows once;
+    # the assessment writer keeps them current from then on
+    backfill_analytics(conn)
+
+
+# Ordered list of (version, description, function). Never edit an applied
+# migration; append a new one instead.
+MIGRATIONS = [
+    (1, "Base colleges and assessments tables", create_base_tables),
+    (2, "Per-row content hash for incremental catalog sync", add_content_hash),
+    (3, "Secondary indexes for college listings and assessment date ranges", add_query_indexes),
+    (4, "FTS5 full-text and prefix search over colleges", add_college_search),
+    (5, "Catalog revision counter maintained by triggers", add_catalog_revision),
+    (6, "Compact assessment rows: score columns and recommendation references", compact_assessments),
+    (7, "Daily analytics rollups per Holland code, course and region", add_analytics_rollups),
+]
+
+LATEST_VERSION = MIGRATIONS[-1][0]
+
+
+def current_version(conn):
+    conn.execute(SCHEMA_VERSION_SQL)
+    return conn.execute("SELECT COALESCE(MAX(version), 0) FROM schema_version").fetchone()[0]
+
+
+def migrate(conn, verbose=False):
+    applied = []
+    version = current_version(conn)
+    for number, description, apply in MIGRATIONS:
+        if number <= version:
+            continue
+        # Each migration and its version record commit together (DDL included)
+        conn.execute("BEGIN")
+        try:
+            apply(conn)
+            conn.execute(
+                "INSERT INTO schema_version (version, description) VALUES (?, ?)",
+                (number, description)
+            )
+            conn.commit()
+        except Exception:
+            conn.rollback()
+            raise
+        applied.append(number)
+        if verbose:
+            print(f"✅ Applied migration {number}: {description}")
+    return applied
+
+
+def migrate_database(db_path=DB_PATH, verbose=False):
+    conn = sqlite3.connect(db_path)
+    try:
+        conn.execute("PRAGMA busy_timeout = 5000")
+        return migrate(conn, verbose)
+    finally:
+        conn.close()
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Upgrade the career guidance database schema in place")
+    parser.add_argument('--db', default=DB_PATH, help="SQLite database file")
+    parser.add_argument('--status', action='store_true', help="Show the schema version without migrating")
+    args = parser.parse_args()
+
+    if args.status:
+        conn = sqlite3.connect(args.db)
+        print(f"📋 Schema version: {current_version(conn)} (latest {LATEST_VERSION})")
+        conn.close()
+    else:
+        applied = migrate_database(args.db, verbose=True)
+        if not applied:
+            print(f"✅ Schema already at version {LATEST_VERSION}")
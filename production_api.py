@@ -0,0 +1,123 @@
+#!/usr/bin/env python3
+"""
+Production API Server
+Career Guidance System
+
+Runs complete_api under gunicorn with a prefork master. The app and the
+college catalog are loaded once in the master before forking, so workers
+share those pages copy-on-write instead of each loading their own copy.
+
+    python production_api.py --workers 4 --threads 8
+
+Signals (sent to the master):
+    HUP   start fresh workers and gracefully stop the old ones
+    TERM  graceful shutdown
+    TTIN / TTOU  add / remove a worker
+"""
+
+import argparse
+import gc
+import multiprocessing
+import os
+
+from complete_api import app, assessment_writer
+from catalog import catalog
+from db import pool
+
+try:
+    from gunicorn.app.base import BaseApplication
+except ImportError:
+    # gunicorn is POSIX-only; Windows installs fall back to the threaded dev server
+    BaseApplication = None
+
+BIND = os.environ.get('CAREER_BIND', '0.0.0.0:5000')
+WORKERS = int(os.environ.get('CAREER_WORKERS', str(multiprocessing.cpu_count())))
+THREADS = int(os.environ.get('CAREER_THREADS', '4'))
+MAX_REQUESTS = int(os.environ.get('CAREER_MAX_REQUESTS', '10000'))
+MAX_REQUESTS_JITTER = int(os.environ.get('CAREER_MAX_REQUESTS_JITTER', '1000'))
+TIMEOUT = int(os.environ.get('CAREER_WORKER_TIMEOUT', '30'))
+GRACEFUL_TIMEOUT = int(os.environ.get('CAREER_GRACEFUL_TIMEOUT', '30'))
+
+
+def prepare_fork():
+    # SQLite connections must not be shared across fork: close the master's
+    # so every worker opens its own. The catalog snapshot itself is kept.
+    pool.close_all()
+    catalog.close()
+
+
+def post_fork(server, worker):
+    # Also called after a HUP, so clear anything the master opened since
+    pool.close_all()
+    catalog.close()
+
+
+def worker_exit(server, worker):
+    # Recycled and reloaded workers commit their queued assessments first
+    assessment_writer.stop()
+
+
+if BaseApplication is not None:
+    class PreforkServer(BaseApplication):
+        def __init__(self, application, options):
+            self.application = application
+            self.options = options
+            super().__init__()
+
+        def load_config(self):
+            for key, value in self.options.items():
+                self.cfg.set(key, value)
+
+        def load(self):
+            # Runs once in the master because preload_app is on
+            if not catalog.ready:
+                catalog.refresh(force=True)
+            prepare_fork()
+            # Keep the preloaded objects out of the collector so its bookkeeping
+            # writes do not un-share their pages in the workers
+            gc.freeze()
+            return self.application
+
+
+def server_options(args):
+    return {
+        'bind': args.bind,
+        'workers': args.workers,
+        'threads': args.threads,
+        'worker_class': 'gthread' if args.threads > 1 else 'sync',
+        'preload_app': True,
+        'max_requests': args.max_requests,
+        'max_requests_jitter': args.max_requests_jitter,
+        'timeout': args.timeout,
+        'graceful_timeout': args.graceful_timeout,
+        'accesslog': '-',
+        'post_fork': post_fork,
+        'worker_exit': worker_exit,
+    }
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description="Run the Career Guidance API with multiple worker processes")
+    parser.add_argument('--bind', default=BIND, help=f"Address to listen on (default: {BIND})")
+    parser.add_argument('--workers', type=int, default=WORKERS, help=f"Worker processes (default: {WORKERS})")
+    parser.add_argument('--threads', type=int, default=THREADS, help=f"Threads per worker (default: {THREADS})")
+    parser.add_argument('--max-requests', type=int, default=MAX_REQUESTS,
+                        help=f"Recycle a worker after this many requests, 0 to disable (default: {MAX_REQUESTS})")
+    parser.add_argument('--max-requests-jitter', type=int, default=MAX_REQUESTS_JITTER,
+                        help="Random extra requests per worker so they do not all recycle at once")
+    parser.add_argument('--timeout', type=int, default=TIMEOUT, help="Restart workers silent for this many seconds")
+    parser.add_argument('--graceful-timeout', type=int, default=GRACEFUL_TIMEOUT,
+                        help="Seconds workers get to finish in-flight requests on reload or shutdown")
+    args = parser.parse_args()
+
+    print("🚀 Starting Career Guidance API (production)...")
+    print(f"✅ API available at: http://{args.bind}")
+    print(f"✅ Colleges loaded: {catalog.stats()['colleges']}")
+
+    if BaseApplication is None:
+        print("⚠️ gunicorn is not available; falling back to a single-process threaded server")
+        host, _, port = args.bind.rpartition(':')
+        app.run(host=host or '0.0.0.0', port=int(port), debug=False, threaded=True)
+    else:
+        print(f"✅ Workers: {args.workers} x {args.threads} threads")
+        PreforkServer(app, server_options(args)).run()
@@ -0,0 +1,68 @@
+#!/usr/bin/env python3
+"""
+Pre-serialized Assessment Question Bank
+Career Guidance System
+"""
+
+import hashlib
+import json
+import os
+import struct
+import zlib
+
+QUESTION_BANK_PATH = os.environ.get(
+    'CAREER_QUESTION_BANK',
+    os.path.join(os.path.dirname(os.path.abspath(__file__)), 'data', 'question_bank.json')
+)
+
+# Fixed gzip member header: deflate, no flags, zero mtime, unknown OS
+GZIP_HEADER = b'\x1f\x8b\x08\x00\x00\x00\x00\x00\x02\xff'
+
+
+def _dumps(value):
+    return json.dumps(value, separators=(',', ':')).encode('utf-8')
+
+
+def _gzip(body):
+    # compressobj rather than zlib.compress(..., wbits=31), which needs 3.11+
+    compressor = zlib.compressobj(9, zlib.DEFLATED, 31)
+    return compressor.compress(body) + compressor.flush()
+
+
+class QuestionBank:
+    def __init__(self, path=QUESTION_BANK_PATH):
+        with open(path, encoding='utf-8') as f:
+            bank = json.load(f)
+
+        self.version = str(bank['version'])
+        content = _dumps({
+            "riasec_questions": bank['riasec_questions'],
+            "quiz_questions": bank['quiz_questions']
+        })
+        self.etag = f"qb-{self.version}-{hashlib.sha1(content).hexdigest()[:12]}"
+
+        # GET /api/assessment/questions: the whole body never changes
+        self.questions_body = b'{"status":"success","question_bank_version":' + _dumps(self.version) + b',' + content[1:]
+        self.questions_gzip = _gzip(self.questions_body)
+
+        # POST /api/assessment/start: everything up to the session id is fixed.
+        # The prefix is deflated once and sync-flushed so a per-request tail can
+        # be appended as its own final deflate block.
+        self.start_prefix = self.questions_body[:-1] + b',"session_id":'
+        compressor = zlib.compressobj(9, zlib.DEFLATED, -zlib.MAX_WBITS)
+        self._prefix_deflate = compressor.compress(self.start_prefix) + compressor.flush(zlib.Z_SYNC_FLUSH)
+        self._prefix_crc = zlib.crc32(self.start_prefix)
+
+    def start_body(self, session_id):
+        return self.start_prefix + _dumps(session_id) + b'}'
+
+    def start_body_gzip(self, session_id):
+        tail = _dumps(session_id) + b'}'
+        compressor = zlib.compressobj(9, zlib.DEFLATED, -zlib.MAX_WBITS)
+        tail_deflate = compressor.compress(tail) + compressor.flush()
+        crc = zlib.crc32(tail, self._prefix_crc)
+        size = (len(self.start_prefix) + len(tail)) & 0xffffffff
+        return GZIP_HEADER + self._prefix_deflate + tail_deflate + struct.pack('<II', crc, size)
+
+
+question_bank = QuestionBank()
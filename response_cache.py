@@ -0,0 +1,143 @@
+#!/usr/bin/env python3
+"""
+Response Cache and Conditional Requests
+Career Guidance System
+"""
+
+import hashlib
+import os
+import threading
+import time
+from collections import OrderedDict
+
+from flask import Response
+
+RESPONSE_CACHE_SIZE = int(os.environ.get('CAREER_RESPONSE_CACHE_SIZE', '512'))
+CACHE_MAX_AGE = int(os.environ.get('CAREER_CACHE_MAX_AGE', '60'))
+RECOMMENDATION_CACHE_SIZE = int(os.environ.get('CAREER_RECOMMENDATION_CACHE_SIZE', '4096'))
+RECOMMENDATION_CACHE_TTL = float(os.environ.get('CAREER_RECOMMENDATION_CACHE_TTL', '3600'))
+
+# Score percentages are rounded to this many decimals in cache keys
+SCORE_DECIMALS = 2
+
+
+class LRUCache:
+    def __init__(self, max_entries, ttl=None):
+        self.max_entries = max_entries
+        self.ttl = ttl
+        self._entries = OrderedDict()
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self.expirations = 0
+
+    def get(self, key):
+        with self._lock:
+            try:
+                expires, value = self._entries[key]
+            except KeyError:
+                self.misses += 1
+                return None
+            if expires is not None and expires <= time.monotonic():
+                del self._entries[key]
+                self.expirations += 1
+                self.misses += 1
+                return None
+            self._entries.move_to_end(key)
+            self.hits += 1
+            return value
+
+    def put(self, key, value):
+        expires = time.monotonic() + self.ttl if self.ttl else None
+        with self._lock:
+            self._entries[key] = (expires, value)
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+                self.evictions += 1
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+
+    def __len__(self):
+        return len(self._entries)
+
+    def stats(self):
+        lookups = self.hits + self.misses
+        return {
+            "entries": len(self._entries),
+            "max_entries": self.max_entries,
+            "hits": self.hits,
+            "misses": self.misses,
+            "evictions": self.evictions,
+            "expirations": self.expirations,
+            "hit_ratio": round(self.hits / lookups, 4) if lookups else 0.0
+        }
+
+
+class CatalogResponseCache:
+    # Serialized responses keyed by normalized parameters; flushed whenever
+    # the catalog version changes so stale entries never linger.
+    def __init__(self, max_entries=RESPONSE_CACHE_SIZE):
+        self.cache = LRUCache(max_entries)
+        self._version = None
+
+    def get(self, version, key):
+        if version != self._version:
+            self.cache.clear()
+            self._version = version
+        return self.cache.get(key)
+
+    def put(self, version, key, response):
+        return self.put_body(version, key, response.get_data())
+
+    def put_body(self, version, key, body):
+        etag = f"{version}-{hashlib.sha1(body).hexdigest()[:12]}"
+        entry = (body, etag)
+        if version == self._version:
+            self.cache.put(key, entry)
+        return entry
+
+    def stats(self):
+        return self.cache.stats()
+
+
+class RecommendationCache:
+    # Recommendation bundles keyed by the rounded RIASEC scores and the quiz
+    # answers. Everything in a bundle is derived from those, the catalog and
+    # the admission model, so it is flushed whenever either version changes.
+    def __init__(self, max_entries=RECOMMENDATION_CACHE_SIZE, ttl=RECOMMENDATION_CACHE_TTL):
+        self.cache = LRUCache(max_entries, ttl)
+        self._version = None
+
+    @staticmethod
+    def key(riasec_scores, answers):
+        scores = tuple(sorted((t, round(float(score), SCORE_DECIMALS)) for t, score in riasec_scores.items()))
+        return scores, tuple(sorted((question_id, repr(answer)) for question_id, answer in answers.items()))
+
+    def get(self, version, key):
+        if version != self._version:
+            self.cache.clear()
+            self._version = version
+        return self.cache.get(key)
+
+    def put(self, version, key, bundle):
+        if version == self._version:
+            self.cache.put(key, bundle)
+        return bundle
+
+    def stats(self):
+        return self.cache.stats()
+
+
+def conditional_response(request, body, etag, last_modified=None, mimetype='application/json', weak=False):
+    response = Response(body, mimetype=mimetype)
+    response.set_etag(etag, weak=weak)
+    if last_modified is not None:
+        response.last_modified = last_modified
+    response.cache_control.public = True
+    response.cache_control.max_age = CACHE_MAX_AGE
+    response.cache_control.must_revalidate = True
+    return response.make_conditional(request)
@@ -0,0 +1,312 @@
+#!/usr/bin/env python3
+"""
+Similar-Student Profile Index
+Career Guidance System
+
+In-memory nearest-neighbour index over the six RIASEC percentages of every
+stored assessment. The bulk of the profiles sit in a k-d tree; profiles
+added since the last build are scanned brute force, and the tree is
+rebuilt in the background once that tail grows. Rows left behind by
+resubmitted sessions are dropped by the same background build once there
+are enough of them.
+"""
+
+import os
+import threading
+import time
+
+import numpy as np
+
+from assessment_store import SCORE_COLUMNS
+from batch_scoring import RIASEC_TYPES
+from db import pool
+
+try:
+    from scipy.spatial import cKDTree
+except ImportError:
+    # scipy ships with scikit-learn; without it every query is a flat scan
+    cKDTree = None
+
+CHECK_INTERVAL = float(os.environ.get('CAREER_SIMILAR_CHECK_INTERVAL', '5.0'))
+REBUILD_MIN_TAIL = 20000
+# Replaced rows allowed before a background build compacts them away; each
+# query over-fetches by this many neighbours to filter them out
+COMPACT_MAX_REPLACED = 1000
+# Unknown session ids force a catch-up read at most this often
+MISS_REFRESH_INTERVAL = 1.0
+LOAD_BATCH_SIZE = 10000
+MAX_NEIGHBOURS = 100
+
+LOAD_PROFILES_SQL = f'''
+    SELECT id, session_id, holland_code, json_extract(courses, '$[0][0]'), {", ".join(SCORE_COLUMNS)}
+    FROM assessments
+    WHERE id > ?
+    ORDER BY id
+    LIMIT ?
+'''
+
+
+def top_course(recommendations):
+    courses = (recommendations or {}).get('course_recommendations') or []
+    return courses[0]['course'] if courses else None
+
+
+class ProfileIndex:
+    def __init__(self, connection_pool=pool, check_interval=CHECK_INTERVAL):
+        self.pool = connection_pool
+        self.check_interval = check_interval
+        self._lock = threading.Lock()
+        self._load_lock = threading.Lock()
+        self._vectors = np.zeros((1024, len(RIASEC_TYPES)), dtype=np.float32)
+        self._alive = np.zeros(1024, dtype=bool)
+        self._size = 0
+        self._replaced = 0
+        self._row_of = {}
+        self._sessions = []
+        self._holland = []
+        self._courses = []
+        self._tree = None
+        self._tree_size = 0
+        self._builder_pid = None
+        self._last_id = 0
+        self._next_check = 0.0
+        self._next_miss_refresh = 0.0
+        self.rebuilds = 0
+        self.compactions = 0
+
+    def __len__(self):
+        return len(self._row_of)
+
+    def add(self, session_id, riasec_scores, holland_code, course):
+        if not session_id:
+            return
+        vector = [float(riasec_scores.get(t, 0) or 0) for t in RIASEC_TYPES]
+        with self._lock:
+            self._append(session_id, vector, holland_code, course)
+        self._maybe_rebuild()
+
+    def _append(self, session_id, vector, holland_code, course):
+        # Caller holds self._lock. A resubmitted session replaces its old row.
+        row = self._row_of.get(session_id)
+        if row is not None:
+            # Compared as stored (float32), or every read-back of this worker's
+            # own rows would look like a resubmit
+            if np.array_equal(self._vectors[row], np.asarray(vector, dtype=np.float32)) \
+                    and self._holland[row] == holland_code:
+                return
+            self._alive[row] = False
+            self._replaced += 1
+
+        if self._size == len(self._vectors):
+            # Grow by doubling; queries keep reading the old arrays meanwhile
+            self._vectors = np.concatenate([self._vectors, np.zeros_like(self._vectors)])
+            self._alive = np.concatenate([self._alive, np.zeros_like(self._alive)])
+
+        row = self._size
+        self._vectors[row] = vector
+        self._alive[row] = True
+        self._sessions.append(session_id)
+        self._holland.append(holland_code)
+        self._courses.append(course)
+        self._row_of[session_id] = row
+        self._size += 1
+
+    def _extend(self, rows):
+        # Caller holds self._lock. Bulk path for rows read from the database:
+        # new sessions are copied in one slice, known ones go through _append.
+        fresh = [row for row in rows if row[1] and row[1] not in self._row_of]
+        if len(fresh) != len(rows):
+            for row_id, session_id, holland_code, course, *scores in rows:
+                if session_id and session_id in self._row_of:
+                    self._append(session_id, [float(s or 0) for s in scores], holland_code, course)
+
+        # Duplicate sessions within one batch keep their last row
+        fresh = list({row[1]: row for row in fresh}.values())
+        if not fresh:
+            return
+        needed = self._size + len(fresh)
+        if needed > len(self._vectors):
+            capacity = max(needed, 2 * len(self._vectors))
+            vectors = np.zeros((capacity, len(RIASEC_TYPES)), dtype=np.float32)
+            vectors[:self._size] = self._vectors[:self._size]
+            alive = np.zeros(capacity, dtype=bool)
+            alive[:self._size] = self._alive[:self._size]
+            self._vectors, self._alive = vectors, alive
+
+        start = self._size
+        # Missing scores read as NULL; they count as zero, as in add()
+        self._vectors[start:needed] = np.nan_to_num(np.array([row[4:] for row in fresh], dtype=np.float64))
+        self._alive[start:needed] = True
+        for offset, row in enumerate(fresh):
+            self._row_of[row[1]] = start + offset
+            self._sessions.append(row[1])
+            self._holland.append(row[2])
+            self._courses.append(row[3])
+        self._size = needed
+
+    def load(self):
+        # Startup: read every stored profile and build the tree before serving
+        # (before the fork, under a preloading server)
+        self.refresh(force=True, rebuild=False)
+        if cKDTree is not None and self._size:
+            self._rebuild(self._vectors, self._size)
+
+    def refresh(self, force=False, rebuild=True):
+        # Picks up assessments committed by other workers since the last check
+        if not force and time.monotonic() < self._next_check:
+            return
+        if not self._load_lock.acquire(blocking=force):
+            return
+        try:
+            self._next_check = time.monotonic() + self.check_interval
+            with self.pool.connection() as conn:
+                while True:
+                    rows = conn.execute(LOAD_PROFILES_SQL, (self._last_id, LOAD_BATCH_SIZE)).fetchall()
+                    if not rows:
+                        break
+                    with self._lock:
+                        self._extend(rows)
+                    self._last_id = rows[-1][0]
+        finally:
+            self._load_lock.release()
+        if rebuild:
+            self._maybe_rebuild()
+
+    def _maybe_rebuild(self):
+        compact = self._replaced >= COMPACT_MAX_REPLACED
+        grown = cKDTree is not None and self._size - self._tree_size >= max(REBUILD_MIN_TAIL, self._tree_size // 10)
+        if not compact and not grown:
+            return
+        with self._lock:
+            # A build started before a fork does not exist in the child
+            if self._builder_pid == os.getpid():
+                return
+            self._builder_pid = os.getpid()
+            vectors, size = self._vectors, self._size
+        target = self._compact if compact else self._rebuild
+        threading.Thread(target=target, args=(vectors, size), name='profile-index-build', daemon=True).start()
+
+    def _rebuild(self, vectors, size):
+        try:
+            tree = cKDTree(vectors[:size].copy())
+            with self._lock:
+                self._tree, self._tree_size = tree, size
+                self.rebuilds += 1
+        finally:
+            self._builder_pid = None
+
+    def _compact(self, vectors, size):
+        # Copies the first size rows without the replaced ones and builds the
+        # tree over them, off the lock; then, under it, carries over the rows
+        # appended (or replaced) meanwhile and swaps everything in
+        try:
+            with self._lock:
+                kept = np.flatnonzero(self._alive[:size])
+                sessions, holland, courses = self._sessions[:size], self._holland[:size], self._courses[:size]
+            kept_rows = kept.tolist()
+            kept_vectors = vectors[kept]
+            row_of = {sessions[r]: i for i, r in enumerate(kept_rows)}
+            kept_holland = [holland[r] for r in kept_rows]
+            kept_courses = [courses[r] for r in kept_rows]
+            tree = cKDTree(kept_vectors.copy()) if cKDTree is not None and len(kept) else None
+
+            with self._lock:
+                base = len(kept)
+                total = base + self._size - size
+                capacity = max(1024, 2 * total)
+                new_vectors = np.zeros((capacity, len(RIASEC_TYPES)), dtype=np.float32)
+                new_vectors[:base] = kept_vectors
+                new_vectors[base:total] = self._vectors[size:self._size]
+                new_alive = np.zeros(capacity, dtype=bool)
+                new_alive[:base] = self._alive[kept]
+                new_alive[base:total] = self._alive[size:self._size]
+                for offset, session_id in enumerate(self._sessions[size:self._size]):
+                    if new_alive[base + offset]:
+                        row_of[session_id] = base + offset
+
+                self._sessions = [sessions[r] for r in kept_rows] + self._sessions[size:self._size]
+                self._holland = kept_holland + self._holland[size:self._size]
+                self._courses = kept_courses + self._courses[size:self._size]
+                self._vectors, self._alive, self._row_of, self._size = new_vectors, new_alive, row_of, total
+                self._replaced = int(total - new_alive[:total].sum())
+                self._tree, self._tree_size = tree, base if tree is not None else 0
+                self.compactions += 1
+                if tree is not None:
+                    self.rebuilds += 1
+        finally:
+            self._builder_pid = None
+
+    def similar(self, session_id, k):
+        row = self._row_of.get(session_id)
+        if row is None:
+            # Possibly stored by another worker since the last check; unknown
+            # ids force at most one catch-up read per MISS_REFRESH_INTERVAL
+            now = time.monotonic()
+            if now >= self._next_miss_refresh:
+                self._next_miss_refresh = now + MISS_REFRESH_INTERVAL
+                self.refresh(force=True)
+            else:
+                self.refresh()
+            row = self._row_of.get(session_id)
+            if row is None:
+                return None
+        self.refresh()
+
+        with self._lock:
+            vectors, alive, size = self._vectors, self._alive, self._size
+            holland, courses = self._holland, self._courses
+            tree, tree_size = self._tree, self._tree_size
+            row = self._row_of[session_id]
+            # Replaced rows and the student's own row are filtered after the search
+            want = k + 1 + self._replaced
+        query = vectors[row]
+
+        distances = []
+        rows = []
+        if tree is not None and tree_size:
+            tree_distances, tree_rows = tree.query(query, k=min(want, tree_size))
+            distances.append(np.atleast_1d(tree_distances))
+            rows.append(np.atleast_1d(tree_rows))
+        if size > tree_size:
+            tail = vectors[tree_size:size]
+            tail_distances = np.sqrt(((tail - query) ** 2).sum(axis=1))
+            if len(tail_distances) > want:
+                nearest = np.argpartition(tail_distances, want - 1)[:want]
+            else:
+                nearest = np.arange(len(tail_distances))
+            distances.append(tail_distances[nearest])
+            rows.append(nearest + tree_size)
+
+        distances = np.concatenate(distances)
+        rows = np.concatenate(rows)
+        keep = alive[rows] & (rows != row)
+        distances, rows = distances[keep], rows[keep]
+        order = np.argsort(distances, kind='stable')[:k]
+
+        return {
+            "holland_code": holland[row],
+            "riasec_scores": dict(zip(RIASEC_TYPES, query.tolist())),
+            "neighbours": [
+                {
+                    "holland_code": holland[r],
+                    "top_course": courses[r],
+                    "distance": round(float(d), 3),
+                    "riasec_scores": dict(zip(RIASEC_TYPES, vectors[r].tolist()))
+                }
+                for d, r in zip(distances[order].tolist(), rows[order].tolist())
+            ]
+        }
+
+    def stats(self):
+        return {
+            "profiles": len(self._row_of),
+            "rows": self._size,
+            "replaced": self._replaced,
+            "tree_rows": self._tree_size,
+            "rebuilds": self.rebuilds,
+            "compactions": self.compactions,
+            "kd_tree": cKDTree is not None
+        }
+
+
+profile_index = ProfileIndex()